@@ -0,0 +1,81 @@
+"""
+Allocation benchmark for evaluating a parsed tree.
+
+Parses an expression once, then evaluates it with each engine under
+tracemalloc and reports how much memory one evaluation allocates at its
+peak, and the time per evaluation. The unboxed engine is measured both
+raw (evaluate) and through visit, which boxes the result.
+
+    python benchmarks/allocations.py --expression "(1 + 2) * 3 - 4 / 2"
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language.utils import Context
+from language.tokens import SymbolTable
+from language.cache import parseSource
+from language.parsing import Interpreter
+from language.unboxed import UnboxedInterpreter
+
+DEFAULT_EXPRESSION = ' + '.join(f'({i} * 3 - {i} ^ 2 / 4) * (agar {i} < 5 hai tho 1 nahi tho -1)' for i in range(20))
+
+
+def engines(context):
+    tree = Interpreter(context)
+    unboxed = UnboxedInterpreter(context)
+    return {
+        'tree': tree.visit,
+        'unboxed': unboxed.visit,
+        'unboxed-raw': unboxed.evaluate,
+    }
+
+
+def measure(evaluate, node, repeat):
+    evaluate(node)
+
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        peak = 0
+        for _ in range(repeat):
+            tracemalloc.reset_peak()
+            evaluate(node)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        evaluate(node)
+    elapsed = time.perf_counter() - start
+
+    return peak, elapsed / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--expression', default=DEFAULT_EXPRESSION)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    node, error = parseSource('<bench>', args.expression)
+    if error:
+        print(error, file=sys.stderr)
+        return 1
+
+    context = Context('<BENCH>', symbol_table=SymbolTable())
+    print(f'{"engine":>12} {"peak bytes":>11} {"us/eval":>9}')
+    for name, evaluate in engines(context).items():
+        peak, seconds = measure(evaluate, node, args.repeat)
+        print(f'{name:>12} {peak:>11} {seconds * 1e6:>9.1f}')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
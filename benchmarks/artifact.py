@@ -0,0 +1,95 @@
+"""
+Cold start benchmark for precompiled bundles.
+
+Writes --files formula files to a temporary directory, then compares what a
+worker does before serving traffic: reading, lexing, parsing and compiling
+every file, against opening a bundle of them (checking every source for
+staleness) and then loading every formula from it, or only the ones used.
+
+    python benchmarks/artifact.py --files 3000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language.parallel import compileProgram
+from language.artifact import buildBundle, openBundle, statementsOf
+
+
+def formula(r):
+    terms = ' + '.join(f'{r.choice("abc")} * {r.randint(1, 99)}' for _ in range(r.randint(3, 12)))
+    return (
+        f'soch a {r.randint(1, 9)} hai\nsoch b {r.randint(1, 9)} hai\nsoch c a * b hai\n'
+        f'agar {terms} > {r.randint(100, 900)} hai tho ({terms}) / 2 nahi tho {terms}\n'
+    )
+
+
+def fromSource(sources):
+    compiled = {}
+    for source in sources:
+        with open(source, 'rb') as file:
+            text = file.read().decode('utf-8')
+        compiled[source] = [compileProgram(source, statement, use_cache=False) for _, _, statement in statementsOf(text)]
+    return compiled
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--files', type=int, default=3000)
+    parser.add_argument('--used', type=float, default=0.1, help='share of formulas a worker ends up using')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    r = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        sources = []
+        for index in range(args.files):
+            source = os.path.join(directory, f'formula{index}.fun')
+            with open(source, 'w') as file:
+                file.write(formula(r))
+            sources.append(source)
+        bundle_path = os.path.join(directory, 'formulas.funb')
+
+        start = time.perf_counter()
+        buildBundle(bundle_path, sources)
+        build = time.perf_counter() - start
+
+        source_bytes = sum(os.path.getsize(source) for source in sources)
+        print(f'{args.files} files, {source_bytes:,} bytes of source, '
+              f'bundle {os.path.getsize(bundle_path):,} bytes built in {build:.2f}s')
+
+        start = time.perf_counter()
+        fromSource(sources)
+        parsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        bundle = openBundle(bundle_path, sources)
+        opened = time.perf_counter() - start
+
+        used = r.sample(sources, max(1, int(len(sources) * args.used)))
+        start = time.perf_counter()
+        for source in used:
+            bundle.load(source)
+        some = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for source in sources:
+            bundle.load(source)
+        rest = time.perf_counter() - start
+        bundle.close()
+
+    print(f'{"start":>22} {"ms":>9}')
+    print(f'{"from source":>22} {parsed * 1e3:>9.1f}')
+    print(f'{"bundle, open":>22} {opened * 1e3:>9.1f}')
+    print(f'{f"bundle, {args.used:.0%} used":>22} {(opened + some) * 1e3:>9.1f}')
+    print(f'{"bundle, all loaded":>22} {(opened + some + rest) * 1e3:>9.1f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
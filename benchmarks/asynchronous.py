@@ -0,0 +1,82 @@
+"""
+Event-loop fairness benchmark for the async evaluation API.
+
+Runs a few long programs alongside a ticker task that measures how late the
+loop wakes it up, first calling the synchronous interpret from a coroutine,
+which blocks the loop for each program, then awaiting interpretAsync, and
+reports the wall time, the ticker's worst delay and the stall metrics.
+
+    python benchmarks/asynchronous.py --programs 4 --terms 4000
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language.core import interpret, interpretAsync
+from language.asynchronous import StallMetrics, YIELD_EVERY
+
+TICK = 0.001
+
+
+def program(index, terms):
+    return ' + '.join(f'(soch n{index} {term} * 2 hai) / 3' for term in range(terms))
+
+
+async def ticker(delays):
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        delays.append(time.perf_counter() - start - TICK)
+
+
+async def blocking(source):
+    return interpret('<bench>', source, engine='iterative', use_cache=False)
+
+
+async def measure(run, sources):
+    delays = []
+    tick = asyncio.create_task(ticker(delays))
+    await asyncio.sleep(TICK * 2)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(run(source) for source in sources))
+    elapsed = time.perf_counter() - start
+
+    # Lets the ticker see how late it woke up after the last program
+    await asyncio.sleep(TICK * 2)
+    tick.cancel()
+    return results, elapsed, max(delays, default=0.0)
+
+
+async def compare(args):
+    sources = [program(index, args.terms) for index in range(args.programs)]
+    metrics = StallMetrics()
+
+    _, sync_time, sync_delay = await measure(blocking, sources)
+    _, async_time, async_delay = await measure(
+        lambda source: interpretAsync('<bench>', source, use_cache=False, every=args.every, metrics=metrics), sources
+    )
+
+    print(f'{"mode":>8} {"seconds":>8} {"worst tick delay ms":>20}')
+    print(f'{"sync":>8} {sync_time:>8.3f} {sync_delay * 1e3:>20.2f}')
+    print(f'{"async":>8} {async_time:>8.3f} {async_delay * 1e3:>20.2f}')
+    print(metrics.asDict())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--programs', type=int, default=4)
+    parser.add_argument('--terms', type=int, default=4000)
+    parser.add_argument('--every', type=int, default=YIELD_EVERY)
+    args = parser.parse_args(argv)
+
+    asyncio.run(compare(args))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Throughput benchmark for batch evaluation over NumPy arrays.
+
+Evaluates one formula over random columns with interpretBatch, and over a
+sample of the same rows one interpret call at a time, and reports rows per
+second for both.
+
+    python benchmarks/batch.py --rows 10000000
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language.core import GLOBALS, interpret, interpretBatch
+from language.datatypes import Number
+
+DEFAULT_EXPRESSION = 'agar a > b hai tho (a - b) / c yaphir a = b hai tho 0 nahi tho b * 2 + c ^ 2'
+
+
+def columns(rows, seed=0):
+    generator = np.random.default_rng(seed)
+    return {
+        'a': generator.integers(-100, 100, rows),
+        'b': generator.integers(-100, 100, rows),
+        'c': generator.integers(0, 10, rows),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--expression', default=DEFAULT_EXPRESSION)
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--scalar-rows', type=int, default=20_000)
+    parser.add_argument('--engine', default='unboxed')
+    args = parser.parse_args(argv)
+
+    data = columns(args.rows)
+    interpretBatch('<bench>', args.expression, {name: column[:10] for name, column in data.items()})
+
+    start = time.perf_counter()
+    res = interpretBatch('<bench>', args.expression, data)
+    batch = time.perf_counter() - start
+    if res.error:
+        print(res.error, file=sys.stderr)
+        return 1
+
+    rows = min(args.scalar_rows, args.rows)
+    start = time.perf_counter()
+    for row in range(rows):
+        for name, column in data.items():
+            GLOBALS.set(name, Number(column[row].item()))
+        interpret('<bench>', args.expression, engine=args.engine)
+    scalar = time.perf_counter() - start
+
+    print(f'{"mode":>8} {"rows":>10} {"rows/s":>14}')
+    print(f'{"batch":>8} {args.rows:>10} {args.rows / batch:>14,.0f}')
+    print(f'{args.engine:>8} {rows:>10} {rows / scalar:>14,.0f}')
+    print(f'failed rows: {int(res.failed.sum())}, rows without a value: {int(res.missing.sum())}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
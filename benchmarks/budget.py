@@ -0,0 +1,79 @@
+"""
+Benchmark for evaluation budgets.
+
+Times the static cost estimate on ordinary formulas, the overhead the
+budgeted interpreter adds over the unboxed one, and how long it takes to
+reject programs that would blow up, with and without the estimate.
+
+    python benchmarks/budget.py --formulas 2000
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language.utils import Context
+from language.tokens import SymbolTable
+from language.datatypes import Number
+from language.cache import parseSource
+from language.unboxed import UnboxedInterpreter
+from language.budget import Budget, BudgetInterpreter, estimateCost
+
+HOSTILE = [
+    '9 ^ 9 ^ 9 ^ 9',
+    '(soch x 10 ^ 1000 hai) * x * x * x * x * x * x * x * x',
+    '1.5 ^ 100000',
+]
+
+
+def formula(index):
+    return f'agar a > {index} hai tho (a * b + c) ^ 2 nahi tho a / (b - {index % 7})'
+
+
+def perCall(run, items, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            run(item)
+    return (time.perf_counter() - start) / (repeat * len(items))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--formulas', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-bits', type=int, default=4096)
+    args = parser.parse_args(argv)
+
+    symbols = SymbolTable()
+    for name, value in (('a', 7), ('b', 3), ('c', 5)):
+        symbols.set(name, Number(value))
+    context = Context('<BENCH>', symbol_table=symbols)
+
+    trees = [parseSource(f'<formula {i}>', formula(i))[0] for i in range(args.formulas)]
+    budget = Budget(max_bits=args.max_bits, max_operations=10000, max_seconds=1)
+    unboxed = UnboxedInterpreter(context)
+    budgeted = BudgetInterpreter(context, budget)
+
+    print(f'{"step":>12} {"us/formula":>11}')
+    print(f'{"estimate":>12} {perCall(lambda tree: estimateCost(tree, symbols), trees, args.repeat) * 1e6:>11.2f}')
+    print(f'{"unboxed":>12} {perCall(unboxed.visit, trees, args.repeat) * 1e6:>11.2f}')
+    print(f'{"budgeted":>12} {perCall(budgeted.visit, trees, args.repeat) * 1e6:>11.2f}')
+
+    print()
+    print(f'{"estimate":>9} {"ms":>8}  program')
+    for estimate in (True, False):
+        checked = Budget(max_bits=args.max_bits, max_seconds=1, estimate=estimate)
+        for source in HOSTILE:
+            tree = parseSource('<hostile>', source)[0]
+            start = time.perf_counter()
+            res = checked.run(tree, Context('<BENCH>', symbol_table=SymbolTable()))
+            elapsed = time.perf_counter() - start
+            print(f'{str(estimate):>9} {elapsed * 1e3:>8.3f}  {source}: {res.error.details if res.error else "ran"}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
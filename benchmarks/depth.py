@@ -0,0 +1,80 @@
+"""
+Deep nesting benchmark for the recursive and iterative parsers and tree walkers.
+
+Generates deeply nested expressions of a few shapes and times parsing and
+evaluating them at several depths. Paths that run out of Python stack are
+reported as RecursionError rather than timed.
+
+    python benchmarks/depth.py --depths 100 1000 100000
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language.utils import Context
+from language.tokens import SymbolTable
+from language.parsing import RegexLexer, PARSERS
+from language.unboxed import UnboxedInterpreter
+from language.iterative import IterativeInterpreter
+
+SHAPES = {
+    # Left-deep sums, each one inside its own parentheses
+    'parens': lambda depth: '(' * depth + '1' + ' + 1)' * depth,
+    # Right-associative power chain
+    'power': lambda depth: ' ^ '.join(['1'] * depth),
+    # Nested negations
+    'negate': lambda depth: '- ' * depth + '1',
+}
+
+INTERPRETERS = {'recursive': UnboxedInterpreter, 'iterative': IterativeInterpreter}
+
+
+def timed(function):
+    start = time.perf_counter()
+    try:
+        result = function()
+    except RecursionError:
+        return None, 'RecursionError'
+    return result, f'{time.perf_counter() - start:.4f}'
+
+
+def run(shape, depth):
+    tokens, error = RegexLexer('<bench>', SHAPES[shape](depth)).tokenize()
+    if error: raise ValueError(repr(error))
+
+    row = {'shape': shape, 'depth': depth}
+    tree = None
+
+    for name, parser in PARSERS.items():
+        res, row[f'parse {name}'] = timed(lambda: parser(tokens).parse())
+        if res is not None: tree = res.value
+
+    for name, interpreter in INTERPRETERS.items():
+        context = Context('<BENCH>', symbol_table=SymbolTable())
+        _, row[f'eval {name}'] = timed(lambda: interpreter(context).visit(tree))
+
+    return row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--depths', type=int, nargs='+', default=[100, 200, 800, 10000, 100000])
+    parser.add_argument('--shapes', nargs='+', default=list(SHAPES), choices=list(SHAPES))
+    args = parser.parse_args(argv)
+
+    columns = ['shape', 'depth'] + [f'parse {name}' for name in PARSERS] + [f'eval {name}' for name in INTERPRETERS]
+    print(' '.join(f'{column:>16}' for column in columns))
+
+    for shape in args.shapes:
+        for depth in args.depths:
+            row = run(shape, depth)
+            print(' '.join(f'{row[column]:>16}' for column in columns))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
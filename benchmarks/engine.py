@@ -0,0 +1,120 @@
+"""
+Stress test and throughput benchmark for Engine under thread contention.
+
+Worker threads hammer a handful of engines at random with programs that
+read and programs that assign, with a tiny thread switch interval so they
+preempt each other as often as possible. Every engine holds an `owner`
+variable only it ever assigns, a counter its workers increment, and a
+pair of variables always assigned together. The run fails if any engine
+reads another's owner, loses an increment, or shows the pair half updated.
+
+    python benchmarks/engine.py --engines 8 --threads 16 --operations 2000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language.errors import ErrorBase
+from language.engine import Engine
+
+
+def worker(engines, increments, problems, seed, operations):
+    r = random.Random(seed)
+    for _ in range(operations):
+        index = r.randrange(len(engines))
+        engine = engines[index]
+        roll = r.random()
+
+        if roll < 0.1:
+            result = engine.interpret('soch count count + 1 hai')
+            increments[index][seed] += 1
+        elif roll < 0.2:
+            value = r.randrange(1000)
+            result = engine.interpret(f'soch left (soch right {value} hai) * 1 hai')
+        elif roll < 0.6:
+            result = engine.interpret('left - right')
+            if not isinstance(result, ErrorBase) and result.value != 0:
+                problems.append(f'engine {index}: pair half updated, left - right = {result.value}')
+        else:
+            result = engine.interpret('owner * 1')
+            if not isinstance(result, ErrorBase) and result.value != index:
+                problems.append(f'engine {index}: read owner {result.value}')
+
+        if isinstance(result, ErrorBase):
+            problems.append(f'engine {index}: {result.name}: {result.details}')
+
+
+def stress(args):
+    engines = [Engine(args.engine) for _ in range(args.engines)]
+    for index, engine in enumerate(engines):
+        engine.interpret(f'soch owner {index} hai')
+        engine.interpret('soch count 0 hai')
+        engine.interpret('soch left (soch right 0 hai) hai')
+
+    increments = [[0] * args.threads for _ in engines]
+    problems = []
+    threads = [
+        threading.Thread(target=worker, args=(engines, increments, problems, seed, args.operations))
+        for seed in range(args.threads)
+    ]
+
+    switch = sys.getswitchinterval()
+    sys.setswitchinterval(args.switch)
+    start = time.perf_counter()
+    try:
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+    finally:
+        sys.setswitchinterval(switch)
+    elapsed = time.perf_counter() - start
+
+    for index, engine in enumerate(engines):
+        if engine.get('count') != sum(increments[index]):
+            problems.append(f'engine {index}: count {engine.get("count")}, expected {sum(increments[index])}')
+        if engine.get('owner') != index:
+            problems.append(f'engine {index}: owner {engine.get("owner")}')
+
+    operations = args.threads * args.operations
+    print(f'{operations} programs on {args.threads} threads over {args.engines} {args.engine} engines '
+          f'in {elapsed:.2f}s, {operations / elapsed:,.0f} programs/s')
+    return problems
+
+
+def batch(args):
+    engine = Engine(args.engine)
+    engine.interpret('soch a 7 hai')
+    texts = [f'a * {index} + {index % 13}' for index in range(args.operations)]
+
+    start = time.perf_counter()
+    results = engine.interpretMany(texts, workers=args.threads)
+    elapsed = time.perf_counter() - start
+
+    expected = [7 * index + index % 13 for index in range(args.operations)]
+    wrong = sum(result.value != value for result, value in zip(results, expected))
+    print(f'interpretMany: {len(texts)} programs on {args.threads} threads in {elapsed:.2f}s, {wrong} wrong')
+    return [f'interpretMany: {wrong} wrong results'] if wrong else []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--engine', default='tree')
+    parser.add_argument('--engines', type=int, default=8)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--operations', type=int, default=2000, help='programs per thread')
+    parser.add_argument('--switch', type=float, default=1e-6, help='thread switch interval in seconds')
+    args = parser.parse_args(argv)
+
+    problems = stress(args) + batch(args)
+    for problem in problems[:20]:
+        print(problem)
+    print('no cross-talk' if not problems else f'{len(problems)} problems')
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Memory benchmark for tokens and parsed trees.
+
+Generates large expressions, lexes and parses them, and reports how many
+bytes each token and each tree node takes. With --max-token-bytes or
+--max-node-bytes it exits non-zero when a measurement goes over the limit,
+so it can run as a CI check:
+
+    python benchmarks/memory.py --terms 20000 --max-node-bytes 400
+"""
+import os
+import sys
+import gc
+import json
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language.parsing import LEXERS, Parser
+from language.optimizer import countNodes
+
+
+def generate(terms, group=32):
+    parts = [
+        f'(soch x{i} {i}.5 hai) * (agar x{i} >= 3 aur y < {i} hai tho {i} nahi tho -{i}) / 2 ^ x{i}'
+        for i in range(terms)
+    ]
+
+    # Parenthesized groups of groups keep the tree shallow enough for the
+    # recursive parser and tree walkers at any size
+    while len(parts) > group:
+        parts = ['(' + ' + '.join(parts[i:i + group]) + ')' for i in range(0, len(parts), group)]
+    return ' + '.join(parts)
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+def run(terms, lexer):
+    text = generate(terms)
+
+    tokens, token_bytes = measure(lambda: LEXERS[lexer]('<bench>', text).tokenize()[0])
+    count = len(tokens)
+    del tokens
+
+    def parse():
+        # Counts what the tree keeps alive, including its tokens and positions,
+        # but not tokens the parser dropped
+        return Parser(LEXERS[lexer]('<bench>', text).tokenize()[0]).parse().value
+    tree, tree_bytes = measure(parse)
+    nodes = countNodes(tree)
+
+    return {
+        'lexer': lexer,
+        'terms': terms,
+        'source_bytes': len(text),
+        'tokens': count,
+        'token_bytes': token_bytes,
+        'bytes_per_token': round(token_bytes / count, 1),
+        'nodes': nodes,
+        'tree_bytes': tree_bytes,
+        'bytes_per_node': round(tree_bytes / nodes, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--terms', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--lexers', nargs='+', default=list(LEXERS), choices=list(LEXERS))
+    parser.add_argument('--max-token-bytes', type=float)
+    parser.add_argument('--max-node-bytes', type=float)
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args(argv)
+
+    results = [run(terms, lexer) for terms in args.terms for lexer in args.lexers]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f'{"lexer":>8} {"terms":>8} {"tokens":>10} {"B/token":>9} {"nodes":>10} {"B/node":>8}')
+        for res in results:
+            print(f'{res["lexer"]:>8} {res["terms"]:>8} {res["tokens"]:>10} {res["bytes_per_token"]:>9} '
+                  f'{res["nodes"]:>10} {res["bytes_per_node"]:>8}')
+
+    failed = False
+    for res in results:
+        if args.max_token_bytes is not None and res['bytes_per_token'] > args.max_token_bytes:
+            print(f'{res["lexer"]} x {res["terms"]}: {res["bytes_per_token"]} bytes per token '
+                  f'is over {args.max_token_bytes}', file=sys.stderr)
+            failed = True
+        if args.max_node_bytes is not None and res['bytes_per_node'] > args.max_node_bytes:
+            print(f'{res["lexer"]} x {res["terms"]}: {res["bytes_per_node"]} bytes per node '
+                  f'is over {args.max_node_bytes}', file=sys.stderr)
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+Scaling benchmark for evaluating many independent programs on a process pool.
+
+Runs the same batch of programs one by one with interpret, then through
+interpretMany with each worker count, both as sources and precompiled,
+and reports programs per second and the speedup over a single worker.
+
+    python benchmarks/parallel.py --programs 20000 --workers 1 2 4 8
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language.core import interpret
+from language.parallel import interpretMany, compileProgram
+
+
+def programs(count, terms=30):
+    return [
+        f'(soch x {i} hai) + ' + ' + '.join(f'(x * {j} - {j} ^ 2 / (x + 1)) * (agar x < {j} hai tho 1 nahi tho -1)' for j in range(terms))
+        for i in range(count)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--programs', type=int, default=20_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args(argv)
+
+    batch = programs(args.programs)
+    compiled = [compileProgram('<bench>', text, use_cache=False)[0] for text in batch]
+
+    start = time.perf_counter()
+    for text in batch:
+        interpret('<bench>', text, engine='vm', use_cache=False)
+    serial = time.perf_counter() - start
+
+    print(f'{"input":>9} {"workers":>8} {"programs/s":>12} {"speedup":>8}')
+    print(f'{"source":>9} {"serial":>8} {len(batch) / serial:>12,.0f} {"":>8}')
+
+    for name, inputs in (('source', batch), ('compiled', compiled)):
+        single = None
+        for workers in sorted(set(args.workers)):
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                executor.submit(int).result()
+
+                start = time.perf_counter()
+                interpretMany(inputs, workers=workers, executor=executor, use_cache=False)
+                elapsed = time.perf_counter() - start
+
+            single = single or elapsed
+            print(f'{name:>9} {workers:>8} {len(batch) / elapsed:>12,.0f} {single / elapsed:>8.2f}')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
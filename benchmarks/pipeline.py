@@ -0,0 +1,62 @@
+"""
+Throughput and memory benchmark for the streaming CSV pipeline.
+
+Writes CSV files of several sizes to a temporary directory, streams each
+through the pipeline, and reports rows per second and the peak memory the
+run allocated, which should stay flat as the files grow.
+
+    python benchmarks/pipeline.py --rows 10000 100000 1000000
+"""
+import os
+import sys
+import random
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language.pipeline import Pipeline
+
+FORMULAS = {
+    'total': 'price * quantity',
+    'discounted': 'agar total > 500 hai tho total * 0.9 nahi tho total',
+    'per_item': 'discounted / quantity',
+}
+
+
+def write(path, rows, seed=0):
+    generator = random.Random(seed)
+    with open(path, 'w') as file:
+        file.write('id,price,quantity,note\n')
+        for row in range(rows):
+            file.write(f'{row},{generator.randint(1, 100)},{generator.randint(0, 20)},item {row}\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args(argv)
+
+    pipeline = Pipeline(FORMULAS)
+    print(f'{"rows":>10} {"file MB":>8} {"rows/s":>10} {"bad":>7} {"peak MB":>8}')
+
+    with tempfile.TemporaryDirectory() as directory:
+        source, output = os.path.join(directory, 'in.csv'), os.path.join(directory, 'out.csv')
+        for rows in args.rows:
+            write(source, rows)
+
+            tracemalloc.start()
+            with open(source, 'rb') as file, open(output, 'w', newline='') as out:
+                stats = pipeline.run(file, out)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            size = os.path.getsize(source) / 1e6
+            print(f'{rows:>10} {size:>8.1f} {stats.rows_per_second:>10,.0f} {stats.bad_rows:>7} {peak / 1e6:>8.1f}')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
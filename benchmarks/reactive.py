@@ -0,0 +1,81 @@
+"""
+Incremental recomputation benchmark for the reactive engine.
+
+Builds a sheet of formulas over a few inputs, each input feeding its own
+group of formulas, then changes one input at a time. Compares re-running
+every formula after each change with the reactive engine, which only
+recomputes the formulas downstream of the input, and reports its counters.
+
+    python benchmarks/reactive.py --inputs 10 --formulas 2000
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language.utils import Context
+from language.tokens import SymbolTable
+from language.cache import parseSource
+from language.unboxed import UnboxedInterpreter
+from language.reactive import ReactiveInterpreter
+
+
+def sheet(inputs, formulas):
+    lines = [f'soch in{i} {i + 1} hai' for i in range(inputs)]
+    for f in range(formulas):
+        group = f % inputs
+        source = f'in{group}' if f < inputs else f'f{f - inputs}'
+        lines.append(f'soch f{f} {source} * 2 - in{group} / 3 hai')
+    return lines
+
+
+def parse(text):
+    node, error = parseSource('<bench>', text)
+    if error: raise ValueError(repr(error))
+    return node
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--inputs', type=int, default=10)
+    parser.add_argument('--formulas', type=int, default=2000)
+    parser.add_argument('--changes', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    definitions = [parse(line) for line in sheet(args.inputs, args.formulas)]
+    formulas = definitions[args.inputs:]
+    changes = [parse(f'soch in{change % args.inputs} {change} hai') for change in range(args.changes)]
+
+    context = Context('<BENCH>', symbol_table=SymbolTable())
+    interpreter = UnboxedInterpreter(context)
+    for node in definitions:
+        interpreter.visit(node)
+
+    start = time.perf_counter()
+    for change in changes:
+        interpreter.visit(change)
+        for node in formulas:
+            interpreter.visit(node)
+    everything = time.perf_counter() - start
+
+    reactive = ReactiveInterpreter(Context('<BENCH>', symbol_table=SymbolTable()))
+    for node in definitions:
+        reactive.visit(node)
+    reactive.profile.__init__()
+
+    start = time.perf_counter()
+    for change in changes:
+        reactive.visit(change)
+    incremental = time.perf_counter() - start
+
+    print(f'{"mode":>12} {"ms/change":>10}')
+    print(f'{"everything":>12} {everything / len(changes) * 1e3:>10.2f}')
+    print(f'{"reactive":>12} {incremental / len(changes) * 1e3:>10.2f}')
+    print(reactive.profile.asDict())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Load test for the evaluation server, entirely on localhost.
+
+Starts a server on a free port, or uses the one at --port, and opens
+--sessions connections that each send --requests programs in pipelined
+batches of --pipeline lines. Reports the throughput, the round-trip
+latency seen by the clients and the latency percentiles the server kept
+for each session.
+
+    python benchmarks/server.py --sessions 50 --requests 400 --pipeline 16
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language.server import Server, LatencyStats
+
+
+def programs(session, count):
+    yield f'soch base {session} hai'
+    for index in range(count - 1):
+        yield f'agar base > {index % 50} hai tho base * {index} + 1 nahi tho (soch base base + 1 hai) / 2'
+
+
+async def client(host, port, session, args, latency: LatencyStats):
+    reader, writer = await asyncio.open_connection(host, port)
+    lines = list(programs(session, args.requests))
+    errors = 0
+
+    for start in range(0, len(lines), args.pipeline):
+        batch = lines[start:start + args.pipeline]
+        sent = time.perf_counter()
+        writer.write(''.join(line + '\n' for line in batch).encode())
+        await writer.drain()
+
+        for _ in batch:
+            reply = json.loads(await reader.readline())
+            errors += 'error' in reply
+            latency.record(time.perf_counter() - sent)
+
+    writer.write(b':stats\n:quit\n')
+    await writer.drain()
+    stats = json.loads(await reader.readline())
+    writer.close()
+    return stats, errors
+
+
+async def load(args):
+    server = None
+    port = args.port
+    if port is None:
+        server = Server()
+        port = (await server.start(port=0)).sockets[0].getsockname()[1]
+
+    latency = LatencyStats(samples=args.sessions * args.requests)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(client('127.0.0.1', port, session, args, latency) for session in range(args.sessions)))
+    elapsed = time.perf_counter() - start
+
+    requests = args.sessions * args.requests
+    p50, p99 = latency.percentiles(0.5, 0.99)
+    print(f'{requests} requests over {args.sessions} sessions in {elapsed:.2f}s, {requests / elapsed:,.0f} requests/s')
+    print(f'client round trip: p50 {p50 * 1e3:.2f} ms, p99 {p99 * 1e3:.2f} ms')
+    print(f'errors: {sum(errors for _, errors in results)}')
+
+    worst = max((stats for stats, _ in results), key=lambda stats: stats['latency']['p99_ms'])
+    print(f'slowest session on the server: {worst["latency"]}')
+    print(f'parse cache: {worst["parse_cache"]}')
+
+    if server is not None: server.server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=None, help='load an already running server')
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--pipeline', type=int, default=16)
+    args = parser.parse_args(argv)
+
+    asyncio.run(load(args))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
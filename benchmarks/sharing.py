@@ -0,0 +1,78 @@
+"""
+Benchmark for numbering subtree shapes and memoized evaluation.
+
+Generates machine-style formulas whose agar/yaphir ladders repeat the same
+subexpressions, numbers the shapes of their subtrees, and reports the time
+that takes and the time to evaluate them with the unboxed and the memoizing
+interpreters. Trees are never shared, so memory is not reported: Shapes only
+add to what the trees hold.
+
+    python benchmarks/sharing.py --formulas 1000 --rungs 12
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language.utils import Context
+from language.tokens import SymbolTable
+from language.datatypes import Number
+from language.cache import parseSource
+from language.hashcons import MemoInterpreter, shapesOf
+from language.unboxed import UnboxedInterpreter
+
+REPEATED = '(a * b + c)'
+
+
+def formula(index, rungs):
+    ladder = ' yaphir '.join(f'{REPEATED} > {index + rung} hai tho {REPEATED} * {rung}' for rung in range(rungs))
+    return f'agar {ladder} nahi tho {REPEATED} - {index}'
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def evaluateAll(visit, trees, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for index, tree in enumerate(trees):
+            visit(index, tree)
+    return (time.perf_counter() - start) / (repeat * len(trees))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--formulas', type=int, default=1000)
+    parser.add_argument('--rungs', type=int, default=12)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    sources = [formula(index, args.rungs) for index in range(args.formulas)]
+    symbols = SymbolTable()
+    for name, value in (('a', 7), ('b', 3), ('c', 5)):
+        symbols.set(name, Number(value))
+    context = Context('<BENCH>', symbol_table=symbols)
+
+    trees = [parseSource(f'<formula {i}>', source)[0] for i, source in enumerate(sources)]
+    shapes, numbering = timed(lambda: [shapesOf(tree) for tree in trees])
+
+    print(f'shapes numbered in {numbering / len(trees) * 1e6:.1f} us per tree')
+    unboxed, memo = UnboxedInterpreter(context), MemoInterpreter(context)
+    rows = [
+        ('unboxed', lambda index, tree: unboxed.visit(tree)),
+        ('memo', lambda index, tree: memo.visit(tree, shapes[index])),
+        ('memo, renumbered', lambda index, tree: memo.visit(tree)),
+    ]
+    print(f'{"engine":>18} {"us/eval":>8}')
+    for name, visit in rows:
+        print(f'{name:>18} {evaluateAll(visit, trees, args.repeat) * 1e6:>8.1f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
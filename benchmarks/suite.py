@@ -0,0 +1,262 @@
+"""
+Benchmark suite timing the lexer, parser, interpreter and end to end.
+
+Every workload is a list of programs generated from a seed of its own: long
+flat sums, deep parentheses, long agar/yaphir ladders, formulas over many
+variables, large numeric literals and huge powers. Each phase is run
+--repeat times with the garbage collector off; the fastest run is kept,
+reported as throughput, and its peak memory is measured in a separate run
+under tracemalloc.
+
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --baseline results.json --threshold 0.15
+
+With --baseline it exits 1 when any phase got slower, or used more memory,
+than the baseline by more than --threshold. Memory only counts once it also
+grew by more than MEMORY_SLACK bytes. Baselines run with other settings are
+not compared, and it exits 2.
+
+The evaluate phase runs the VM on compiled bytecode and the memoizing
+interpreter on numbered Shapes, built beforehand, as they are for cached
+trees; end_to_end builds them on every call.
+"""
+import os
+import sys
+import gc
+import json
+import zlib
+import time
+import random
+import argparse
+import platform
+import statistics
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language.utils import Context
+from language.tokens import SymbolTable
+from language.parsing import LEXERS, PARSERS
+from language.resolver import walk
+from language.cache import parseSource
+from language.transpiler import Program
+from language.core import ENGINES, GLOBALS, PREPARE, interpret, runTree
+
+# Peaks this small move with interpreter internals, not with the code measured
+MEMORY_SLACK = 64 * 1024
+
+VARIABLES = [f'v{index}' for index in range(40)]
+SETUP = [f'soch {name} {index + 2} hai' for index, name in enumerate(VARIABLES)]
+
+
+# ===========================
+# WORKLOADS
+# ===========================
+def flatSums(r, scale):
+    return [' + '.join(str(r.randint(0, 999)) for _ in range(300)) for _ in range(100 * scale)]
+
+
+def deepParentheses(r, scale):
+    return ['(' * 150 + str(r.randint(0, 9)) + f' + {r.randint(1, 9)})' * 150 for _ in range(100 * scale)]
+
+
+def conditionLadders(r, scale):
+    def ladder():
+        rungs = ' yaphir '.join(f'{r.randint(0, 99)} > {100 + rung} hai tho {rung}' for rung in range(200))
+        return f'agar {rungs} nahitho -1'
+    return [ladder() for _ in range(100 * scale)]
+
+
+def manyVariables(r, scale):
+    def formula():
+        return ' + '.join(f'{r.choice(VARIABLES)} * {r.choice(VARIABLES)} / {r.choice(VARIABLES)}' for _ in range(50))
+    return [formula() for _ in range(200 * scale)]
+
+
+def largeLiterals(r, scale):
+    def literal():
+        return str(r.randint(1, 9)) + ''.join(str(r.randint(0, 9)) for _ in range(299))
+    return [' * '.join(literal() for _ in range(4)) + ' - ' + literal() for _ in range(100 * scale)]
+
+
+def hugePowers(r, scale):
+    def power():
+        return f'{r.randint(2, 99)} ^ {r.randint(2000, 4000)}'
+    return [f'{power()} * {power()} - {power()}' for _ in range(20 * scale)]
+
+
+WORKLOADS = {
+    'flat_sums': flatSums,
+    'deep_parentheses': deepParentheses,
+    'condition_ladders': conditionLadders,
+    'many_variables': manyVariables,
+    'large_literals': largeLiterals,
+    'huge_powers': hugePowers,
+}
+
+
+# ===========================
+# MEASURING
+# ===========================
+def timed(function, repeat):
+    times = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return min(times), statistics.median(times)
+
+
+def peakOf(function):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def phase(function, repeat, count, unit):
+    best, median = timed(function, repeat)
+    return {
+        'seconds': best,
+        'median_seconds': median,
+        'count': count,
+        'unit': unit,
+        'throughput': count / best if best else 0.0,
+        'peak_bytes': peakOf(function),
+    }
+
+
+def runWorkload(programs, args):
+    lexer, parser = LEXERS[args.lexer], PARSERS[args.parser]
+
+    tokens = [lexer('<bench>', text).tokenize()[0] for text in programs]
+    trees = [parseSource('<bench>', text, lexer=args.lexer, parser=args.parser)[0] for text in programs]
+    token_count = sum(len(stream) for stream in tokens)
+    node_count = sum(sum(1 for _ in walk(tree)) for tree in trees)
+
+    context = Context('<MAIN>', symbol_table=SymbolTable())
+    for statement in SETUP:
+        interpret('<setup>', statement, use_cache=False)
+        runTree('tree', parseSource('<setup>', statement)[0], context)
+
+    if args.engine == 'python':
+        compiled = [(Program.fromNode(tree), text) for tree, text in zip(trees, programs)]
+        run = lambda index: compiled[index][0].run(context, '<bench>', compiled[index][1])
+    elif args.engine in PREPARE:
+        prepared = [PREPARE[args.engine](tree) for tree in trees]
+        run = lambda index: runTree(args.engine, trees[index], context, prepared[index])
+    else:
+        run = lambda index: runTree(args.engine, trees[index], context)
+
+    for index, text in enumerate(programs):
+        res = run(index)
+        if res.error: raise SystemExit(f'{text[:60]}...: {res.error!r}')
+
+    def lex():
+        for text in programs: lexer('<bench>', text).tokenize()
+
+    def parse():
+        for stream in tokens: parser(stream).parse()
+
+    def evaluate():
+        for index in range(len(programs)): run(index)
+
+    def endToEnd():
+        for text in programs: interpret('<bench>', text, args.engine, use_cache=False, lexer=args.lexer, parser=args.parser)
+
+    return {
+        'lex': phase(lex, args.repeat, token_count, 'tokens/s'),
+        'parse': phase(parse, args.repeat, node_count, 'nodes/s'),
+        'evaluate': phase(evaluate, args.repeat, len(trees), 'evals/s'),
+        'end_to_end': phase(endToEnd, args.repeat, len(programs), 'evals/s'),
+    }
+
+
+# ===========================
+# BASELINE
+# ===========================
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f'\n{"workload":>18} {"phase":>11} {"time":>8} {"memory":>8}')
+    for workload, phases in results['workloads'].items():
+        for name, current in phases.items():
+            before = baseline.get('workloads', {}).get(workload, {}).get(name)
+            if before is None: continue
+
+            time_ratio = current['seconds'] / before['seconds'] if before['seconds'] else 1.0
+            memory_ratio = current['peak_bytes'] / before['peak_bytes'] if before['peak_bytes'] else 1.0
+            grown = current['peak_bytes'] - before['peak_bytes'] > MEMORY_SLACK
+            flag = ''
+            if time_ratio > 1 + threshold or (memory_ratio > 1 + threshold and grown):
+                regressions.append((workload, name))
+                flag = '  REGRESSION'
+            print(f'{workload:>18} {name:>11} {time_ratio - 1:>+8.1%} {memory_ratio - 1:>+8.1%}{flag}')
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workloads', nargs='+', default=list(WORKLOADS), choices=list(WORKLOADS))
+    parser.add_argument('--lexer', default='regex', choices=list(LEXERS))
+    parser.add_argument('--parser', default='recursive', choices=list(PARSERS))
+    parser.add_argument('--engine', default='tree', choices=[e for e in ENGINES if e not in ('adaptive', 'reactive')])
+    parser.add_argument('--scale', type=int, default=1, help='multiplies the number of programs per workload')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='file to save the results to, as JSON')
+    parser.add_argument('--baseline', help='results saved earlier to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='slowdown tolerated, as a fraction')
+    args = parser.parse_args(argv)
+
+    results = {
+        'environment': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+        },
+        'settings': {key: getattr(args, key) for key in ('lexer', 'parser', 'engine', 'scale', 'repeat', 'seed')},
+        'workloads': {},
+    }
+
+    print(f'{"workload":>18} {"phase":>11} {"ms":>9} {"throughput":>16} {"peak KB":>9}')
+    for workload in args.workloads:
+        # Seeded by name, so a workload gets the same programs whichever others run
+        programs = WORKLOADS[workload](random.Random(zlib.crc32(workload.encode()) ^ args.seed), args.scale)
+        phases = results['workloads'][workload] = runWorkload(programs, args)
+        for name, res in phases.items():
+            print(f'{workload:>18} {name:>11} {res["seconds"] * 1e3:>9.1f} '
+                  f'{res["throughput"]:>10,.0f} {res["unit"]:<5} {res["peak_bytes"] / 1024:>9,.0f}')
+    GLOBALS.clear()
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline.get('settings') != results['settings']:
+            print(f'\nBaseline settings {baseline.get("settings")} differ from {results["settings"]}, not comparing')
+            return 2
+
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'\n{len(regressions)} phases regressed by more than {args.threshold:.0%}')
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
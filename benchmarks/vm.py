@@ -0,0 +1,85 @@
+"""
+Tree walker against bytecode VM on repeatedly evaluated expressions.
+
+Generates --formulas random formulas over a few variables and evaluates each
+one --repeat times through core.interpret, so after the first call both
+engines start from a cached tree and the VM from its cached bytecode. Also
+times the VM recompiling on every call, as it did before bytecode was cached.
+
+    python benchmarks/vm.py --formulas 200 --repeat 200
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language.utils import Context
+from language.errors import ErrorBase
+from language.core import GLOBALS, PARSE_CACHE, interpret, runTree
+
+NAMES = 'abcdef'
+
+
+def formula(r, depth=0):
+    if depth > 3 or r.random() < 0.2:
+        return r.choice(NAMES) if r.random() < 0.5 else str(r.randint(1, 99))
+    if r.random() < 0.1:
+        return f'agar {formula(r, depth + 1)} > 50 hai tho {formula(r, depth + 1)} nahitho {formula(r, depth + 1)}'
+    op = r.choice('+-*/')
+    return f'({formula(r, depth + 1)} {op} {formula(r, depth + 1)})'
+
+
+def outcome(result):
+    return repr(result) if isinstance(result, ErrorBase) else result.value
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--formulas', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    r = random.Random(args.seed)
+    for index, name in enumerate(NAMES):
+        interpret('<setup>', f'soch {name} {index + 2} hai')
+    texts = [formula(r) for _ in range(args.formulas)]
+
+    for text in texts:
+        if outcome(interpret('<bench>', text, 'tree')) != outcome(interpret('<bench>', text, 'vm')):
+            print(f'engines disagree on {text}')
+            return 1
+
+    def recompiled():
+        context = Context('<MAIN>', symbol_table=GLOBALS)
+        for text in texts:
+            node, _ = PARSE_CACHE.parse('<bench>', text)
+            for _ in range(args.repeat): runTree('vm', node, context)
+
+    evaluations = args.formulas * args.repeat
+    rows = [
+        ('tree', timed(lambda: [interpret('<bench>', text, 'tree') for text in texts for _ in range(args.repeat)])),
+        ('vm', timed(lambda: [interpret('<bench>', text, 'vm') for text in texts for _ in range(args.repeat)])),
+        ('vm, recompiling', timed(recompiled)),
+    ]
+    GLOBALS.clear()
+
+    tree = rows[0][1]
+    print(f'{evaluations} evaluations of {args.formulas} formulas')
+    print(f'{"engine":>16} {"s":>8} {"evals/s":>10} {"vs tree":>8}')
+    for name, elapsed in rows:
+        print(f'{name:>16} {elapsed:>8.3f} {evaluations / elapsed:>10,.0f} {tree / elapsed:>7.2f}x')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
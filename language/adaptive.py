@@ -0,0 +1,400 @@
+import operator
+import threading
+
+from language.datatypes import Number
+from language.nodes import *
+from language.errors import RunTimeError
+from language.tokens import TokenType, Keyword
+from language.results import RuntimeResult
+from language.parsing import Interpreter
+
+# Executions of a generic node before it tries to specialize itself, and
+# deoptimizations after which it stops trying and stays generic for good.
+WARMUP = 8
+MAX_DEOPTS = 4
+GENERIC = object()
+
+
+class EvaluationFailure(Exception):
+    def __init__(self, node, details):
+        super().__init__(details)
+        self.node = node
+        self.details = details
+
+
+def equalTo(left, right): return int(left == right)
+def notEqualTo(left, right): return int(left != right)
+def lessThan(left, right): return int(left < right)
+def lessThanEqTo(left, right): return int(left <= right)
+def greaterThan(left, right): return int(left > right)
+def greaterThanEqualTo(left, right): return int(left >= right)
+def andWith(left, right): return int(left and right)
+def orWith(left, right): return int(left or right)
+
+
+OPERATIONS = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.MULTIPLY: operator.mul,
+    TokenType.DIVIDE: operator.truediv,
+    TokenType.POWER: operator.pow,
+
+    TokenType.EQUAL: equalTo,
+    TokenType.NOT_EQUAL: notEqualTo,
+    TokenType.LESS_THAN: lessThan,
+    TokenType.LESS_THAN_EQUAL: lessThanEqTo,
+    TokenType.GREATER_THAN: greaterThan,
+    TokenType.GREATER_THAN_EQUAL: greaterThanEqualTo,
+
+    Keyword.AND: andWith,
+    Keyword.OR: orWith,
+}
+
+
+# ===========================
+# PROFILE
+# ===========================
+class Profile:
+    def __init__(self):
+        self.specialized = 0
+        self.deoptimized = 0
+        self.cache_misses = 0
+
+    def asDict(self):
+        return {
+            'specialized': self.specialized,
+            'deoptimized': self.deoptimized,
+            'cache_misses': self.cache_misses,
+        }
+
+
+# ===========================
+# EXECUTABLE NODES
+# ===========================
+class Executable:
+    __slots__ = ('node',)
+
+    def origin(self):
+        return self.node
+
+
+class Constant(Executable):
+    __slots__ = ('value',)
+
+    def __init__(self, node, value):
+        self.node = node
+        self.value = value
+
+    def execute(self):
+        return self.value
+
+
+class Negate(Executable):
+    __slots__ = ('operand',)
+
+    def __init__(self, node, operand):
+        self.node = node
+        self.operand = operand
+
+    def execute(self):
+        return -self.operand.execute()
+
+
+class Positive(Negate):
+    __slots__ = ()
+
+    def execute(self):
+        return self.operand.execute()
+
+
+class VarAccess(Executable):
+    """
+    Reads a variable through an inline cache: the raw value is kept together
+    with the symbol table version it was read at, and reused until the table
+    changes again.
+    """
+
+    __slots__ = ('name', 'symbols', 'version', 'value', 'profile')
+
+    def __init__(self, node, symbols, profile):
+        self.node = node
+        self.name = node.var_name.value
+        self.symbols = symbols
+        self.version = -1
+        self.value = None
+        self.profile = profile
+
+    def execute(self):
+        if self.symbols.version == self.version:
+            return self.value
+
+        self.profile.cache_misses += 1
+        # Read first, so a write landing during the lookup invalidates the value
+        version = self.symbols.version
+        value = self.symbols.get(self.name)
+        if value is None:
+            raise EvaluationFailure(self.node, f'{self.name} is not defined!')
+
+        # Lookups through a parent table cannot be validated by our version alone
+        if self.symbols.parent is None:
+            self.version = version
+        self.value = value.value
+        return self.value
+
+
+class VarAssign(Executable):
+    __slots__ = ('name', 'value', 'symbols', 'context')
+
+    def __init__(self, node, value, symbols, context):
+        self.node = node
+        self.name = node.var_name.value
+        self.value = value
+        self.symbols = symbols
+        self.context = context
+
+    def origin(self):
+        return self.value.origin()
+
+    def execute(self):
+        value = self.value.execute()
+        if value is None:
+            self.symbols.set(self.name, None)
+        else:
+            origin = self.value.origin()
+            self.symbols.set(self.name, Number(value, origin.pos_start, origin.pos_end, self.context))
+        return value
+
+
+class Conditions(Executable):
+    __slots__ = ('cases', 'else_case', 'taken')
+
+    def __init__(self, node, cases, else_case):
+        self.node = node
+        self.cases = cases
+        self.else_case = else_case
+        self.taken = None
+
+    def origin(self):
+        return self.taken.origin()
+
+    def execute(self):
+        for cond, expr in self.cases:
+            if cond.execute() != 0:
+                self.taken = expr
+                return expr.execute()
+
+        self.taken = self.else_case
+        return self.else_case.execute() if self.else_case else None
+
+
+class BinaryOp(Executable):
+    """
+    Generic binary operation. It profiles the types of its operands and, once
+    they have been the same int or float pair for WARMUP executions, rewrites
+    its own class to a specialized form from SPECIALIZATIONS.
+    """
+
+    __slots__ = ('left', 'right', 'token_type', 'operation', 'kind', 'hits', 'deopts', 'profile')
+
+    def __init__(self, node, left, right, profile):
+        self.node = node
+        self.left = left
+        self.right = right
+        self.token_type = node.operator.token_type
+        self.operation = OPERATIONS.get(self.token_type) or OPERATIONS[node.operator.value]
+        self.kind = None
+        self.hits = 0
+        self.deopts = 0
+        self.profile = profile
+
+    def execute(self):
+        left = self.left.execute()
+        right = self.right.execute()
+        return self.generic(left, right)
+
+    def generic(self, left, right):
+        kind = left.__class__
+        if kind is right.__class__ and kind is self.kind:
+            self.hits += 1
+            if self.hits >= WARMUP: self.specialize()
+        elif self.kind is not GENERIC:
+            self.kind = kind if kind is right.__class__ else None
+            self.hits = 1
+
+        try:
+            return self.operation(left, right)
+        except ZeroDivisionError:
+            if self.token_type != TokenType.DIVIDE: raise
+            raise EvaluationFailure(self.right.origin(), 'Division by zero not defined')
+
+    def specialize(self):
+        specialized = SPECIALIZATIONS.get((self.token_type, self.kind))
+        if specialized is None:
+            self.kind = GENERIC
+            return
+
+        self.__class__ = specialized
+        self.profile.specialized += 1
+
+    def deoptimize(self, left, right):
+        self.__class__ = BinaryOp
+        self.profile.deoptimized += 1
+
+        self.deopts += 1
+        self.kind = GENERIC if self.deopts >= MAX_DEOPTS else None
+        self.hits = 0
+        return self.generic(left, right)
+
+
+class IntAdd(BinaryOp):
+    __slots__ = ()
+
+    def execute(self):
+        left = self.left.execute()
+        right = self.right.execute()
+        if left.__class__ is int and right.__class__ is int: return left + right
+        return self.deoptimize(left, right)
+
+
+class IntSub(BinaryOp):
+    __slots__ = ()
+
+    def execute(self):
+        left = self.left.execute()
+        right = self.right.execute()
+        if left.__class__ is int and right.__class__ is int: return left - right
+        return self.deoptimize(left, right)
+
+
+class IntMul(BinaryOp):
+    __slots__ = ()
+
+    def execute(self):
+        left = self.left.execute()
+        right = self.right.execute()
+        if left.__class__ is int and right.__class__ is int: return left * right
+        return self.deoptimize(left, right)
+
+
+class IntDiv(BinaryOp):
+    __slots__ = ()
+
+    def execute(self):
+        left = self.left.execute()
+        right = self.right.execute()
+        if left.__class__ is int and right.__class__ is int and right: return left / right
+        return self.deoptimize(left, right)
+
+
+class FloatAdd(BinaryOp):
+    __slots__ = ()
+
+    def execute(self):
+        left = self.left.execute()
+        right = self.right.execute()
+        if left.__class__ is float and right.__class__ is float: return left + right
+        return self.deoptimize(left, right)
+
+
+class FloatSub(BinaryOp):
+    __slots__ = ()
+
+    def execute(self):
+        left = self.left.execute()
+        right = self.right.execute()
+        if left.__class__ is float and right.__class__ is float: return left - right
+        return self.deoptimize(left, right)
+
+
+class FloatMul(BinaryOp):
+    __slots__ = ()
+
+    def execute(self):
+        left = self.left.execute()
+        right = self.right.execute()
+        if left.__class__ is float and right.__class__ is float: return left * right
+        return self.deoptimize(left, right)
+
+
+class FloatDiv(BinaryOp):
+    __slots__ = ()
+
+    def execute(self):
+        left = self.left.execute()
+        right = self.right.execute()
+        if left.__class__ is float and right.__class__ is float and right: return left / right
+        return self.deoptimize(left, right)
+
+
+SPECIALIZATIONS = {
+    (TokenType.PLUS, int): IntAdd,
+    (TokenType.MINUS, int): IntSub,
+    (TokenType.MULTIPLY, int): IntMul,
+    (TokenType.DIVIDE, int): IntDiv,
+    (TokenType.PLUS, float): FloatAdd,
+    (TokenType.MINUS, float): FloatSub,
+    (TokenType.MULTIPLY, float): FloatMul,
+    (TokenType.DIVIDE, float): FloatDiv,
+}
+
+
+# ===========================
+# ADAPTIVE INTERPRETER
+# ===========================
+class AdaptiveInterpreter(Interpreter):
+    """
+    Evaluates node trees through executable nodes that specialize themselves
+    to the operand types they see. Executable trees are built by `build` and
+    get faster every time they are passed back to `visit`, so callers keep
+    one per parsed tree, as core.interpret does alongside its cached trees.
+
+    Executable nodes rewrite themselves as they run, so evaluations on one
+    interpreter take turns.
+    """
+
+    def __init__(self, context):
+        super().__init__(context)
+        self.profile = Profile()
+        self.lock = threading.Lock()
+
+    def visit(self, node, executable=None):
+        if executable is None: executable = self.build(node)
+
+        with self.lock:
+            try:
+                value = executable.execute()
+            except EvaluationFailure as failure:
+                return RuntimeResult().failure(RunTimeError(
+                    self.context, failure.details,
+                    failure.node.pos_start, failure.node.pos_end
+                ))
+
+            if value is None: return RuntimeResult().success(None)
+            origin = executable.origin()
+        return RuntimeResult().success(Number(value, origin.pos_start, origin.pos_end, self.context))
+
+    def stats(self):
+        return self.profile.asDict()
+
+    def build(self, node):
+        symbols = self.context.symbol_table
+
+        if isinstance(node, NumberNode):
+            return Constant(node, node.token.value)
+
+        if isinstance(node, UnaryOpNode):
+            if node.operator.token_type == TokenType.MINUS:
+                return Negate(node, self.build(node.node))
+            return Positive(node, self.build(node.node))
+
+        if isinstance(node, BinaryOpNode):
+            return BinaryOp(node, self.build(node.left), self.build(node.right), self.profile)
+
+        if isinstance(node, VarAccessNode):
+            return VarAccess(node, symbols, self.profile)
+
+        if isinstance(node, VarAssignNode):
+            return VarAssign(node, self.build(node.value), symbols, self.context)
+
+        cases = [(self.build(cond), self.build(expr)) for cond, expr in node.cases]
+        return Conditions(node, cases, node.else_case and self.build(node.else_case))
@@ -0,0 +1,302 @@
+"""
+Bundles of precompiled .fun files, so workers start without lexing or
+parsing anything.
+
+    python -m language.artifact formulas.funb formulas/*.fun
+
+A bundle is a header, an index and one record per source file:
+
+    header  magic, format version, flags, entry count, index length and crc32
+    index   marshalled (path, size, mtime_ns, digest, offset, length, crc32)
+    records compressed, marshalled source text and, for every statement,
+            its bytecode with the source offsets of its positions
+
+Bundles are memory-mapped and a record is only read, checked against its
+crc32 and turned back into bytecode the first time its file is asked for.
+The source text travels in the record, so errors point into the original
+file even where it is absent.
+"""
+import os
+import sys
+import zlib
+import mmap
+import struct
+import marshal
+import hashlib
+import argparse
+from array import array
+
+from language.utils import Context
+from language.tokens import SymbolTable
+from language.errors import ErrorBase
+from language.bytecode import Bytecode, VM
+from language.parallel import compileProgram
+from language.core import atLine
+
+MAGIC = b'FUNBNDL\x00'
+
+# Bumped whenever records or opcodes change, so older bundles are rebuilt
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct('<8sHHIII')
+OPTIMIZED = 1
+
+
+class ArtifactError(Exception):
+    pass
+
+
+def digestOf(data: bytes):
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+# ===========================
+# BUILDING
+# ===========================
+def packed(numbers):
+    # Instructions and offsets as little-endian 32-bit ints
+    numbers = array('i', numbers)
+    if sys.byteorder == 'big': numbers.byteswap()
+    return numbers.tobytes()
+
+
+def unpacked(data):
+    numbers = array('i')
+    numbers.frombytes(data)
+    if sys.byteorder == 'big': numbers.byteswap()
+    return numbers
+
+
+def statementsOf(text):
+    # Non-blank lines with their line number and offset, as interpretScript runs them
+    offset = 0
+    for line_no, line in enumerate(text.split('\n')):
+        statement = line.rstrip('\r')
+        if statement.strip(' \t'):
+            yield line_no, offset, statement
+        offset += len(line) + 1
+
+
+def recordOf(filename, text, optimize=False):
+    statements = []
+    for line_no, offset, statement in statementsOf(text):
+        code, error = compileProgram(filename, statement, optimize, use_cache=False)
+        if error:
+            # Parsed again on load, which rebuilds the same error
+            statements.append((line_no, offset, len(statement), None))
+            continue
+
+        ops, consts, names, offsets, (_, _, start, end) = code.__getstate__()
+        statements.append((
+            line_no, offset, len(statement),
+            (packed(ops), tuple(consts), tuple(names), packed(offsets), start, end)
+        ))
+
+    return zlib.compress(marshal.dumps((text, tuple(statements))), 1)
+
+
+def buildBundle(path, sources, optimize=False):
+    """
+    Compiles every file in `sources` into a bundle written to `path`,
+    atomically, and returns the number of files bundled.
+    """
+
+    index = []
+    records = []
+    offset = 0
+    for source in sources:
+        with open(source, 'rb') as file:
+            data = file.read()
+        stat = os.stat(source)
+
+        record = recordOf(source, data.decode('utf-8'), optimize)
+        index.append((source, stat.st_size, stat.st_mtime_ns, digestOf(data), offset, len(record), zlib.crc32(record)))
+        records.append(record)
+        offset += len(record)
+
+    index = marshal.dumps(tuple(index))
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, OPTIMIZED if optimize else 0, len(records), len(index), zlib.crc32(index))
+
+    temp = f'{path}.{os.getpid()}.tmp'
+    with open(temp, 'wb') as file:
+        file.write(header)
+        file.write(index)
+        for record in records:
+            file.write(record)
+    os.replace(temp, path)
+    return len(records)
+
+
+# ===========================
+# COMPILED SOURCE
+# ===========================
+class CompiledSource:
+    """
+    The statements of one source file, each compiled to bytecode or kept as
+    the error it failed to compile with, alongside the line it came from.
+    """
+
+    def __init__(self, filename, text, statements):
+        self.filename = filename
+        self.text = text
+        self.statements = statements
+
+    @classmethod
+    def fromRecord(cls, filename, record):
+        text, entries = marshal.loads(zlib.decompress(record))
+
+        statements = []
+        for line_no, offset, length, state in entries:
+            statement = text[offset:offset + length]
+            if state is None:
+                _, error = compileProgram(filename, statement, use_cache=False)
+                statements.append((line_no, error))
+                continue
+
+            ops, consts, names, offsets, start, end = state
+            code = Bytecode.__new__(Bytecode)
+            code.__setstate__((
+                unpacked(ops), list(consts), list(names), unpacked(offsets),
+                (filename, statement, start, end)
+            ))
+            statements.append((line_no, code))
+
+        return cls(filename, text, statements)
+
+    def run(self, context=None) -> list:
+        """
+        Runs every statement, in a global scope of its own unless `context`
+        is given, returning what interpretScript yields for each one.
+        """
+
+        context = context or Context('<MAIN>', symbol_table=SymbolTable())
+        results = []
+        for line_no, code in self.statements:
+            if isinstance(code, ErrorBase):
+                results.append(atLine(code, line_no))
+                break
+
+            res = VM(context).run(code)
+            if res.error:
+                results.append(atLine(res.error, line_no))
+                break
+            results.append(res.value)
+        return results
+
+
+# ===========================
+# BUNDLE
+# ===========================
+class Bundle:
+    """
+    A bundle file, memory-mapped. Raises ArtifactError when the file is not
+    a bundle of this format version or its index fails its checksum.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, flags, count, index_length, index_crc = HEADER.unpack_from(self.map, 0)
+        except (ValueError, struct.error):
+            self.file.close()
+            raise ArtifactError(f'{path} is not a bundle')
+
+        try:
+            if magic != MAGIC:
+                raise ArtifactError(f'{path} is not a bundle')
+            if version != FORMAT_VERSION:
+                raise ArtifactError(f'{path} is format version {version}, not {FORMAT_VERSION}')
+
+            index = self.map[HEADER.size:HEADER.size + index_length]
+            if zlib.crc32(index) != index_crc:
+                raise ArtifactError(f'{path} has a corrupt index')
+        except ArtifactError:
+            self.close()
+            raise
+
+        self.optimize = bool(flags & OPTIMIZED)
+        self.base = HEADER.size + index_length
+        self.entries = {entry[0]: entry[1:] for entry in marshal.loads(index)}
+        self.loaded = {}
+
+    def __contains__(self, source):
+        return source in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def isStale(self, source):
+        # Sources that are absent are served from the bundle as they were
+        size, mtime_ns, digest = self.entries[source][:3]
+        try:
+            stat = os.stat(source)
+        except OSError:
+            return False
+        if (stat.st_size, stat.st_mtime_ns) == (size, mtime_ns): return False
+
+        with open(source, 'rb') as file:
+            return digestOf(file.read()) != digest
+
+    def stale(self, sources):
+        return set(sources) != set(self.entries) or any(self.isStale(source) for source in sources)
+
+    def load(self, source) -> CompiledSource:
+        compiled = self.loaded.get(source)
+        if compiled is not None: return compiled
+
+        offset, length, crc = self.entries[source][3:]
+        start = self.base + offset
+        record = self.map[start:start + length]
+        if zlib.crc32(record) != crc:
+            raise ArtifactError(f'{self.path} has a corrupt record for {source}')
+
+        compiled = self.loaded[source] = CompiledSource.fromRecord(source, record)
+        return compiled
+
+
+def openBundle(path, sources, optimize=False) -> Bundle:
+    """
+    Opens the bundle at `path`, rebuilding it from `sources` first when it
+    is missing, unreadable, of another format version, built with other
+    options, or out of date with any of the sources.
+    """
+
+    try:
+        bundle = Bundle(path)
+    except (OSError, ArtifactError):
+        bundle = None
+
+    if bundle is not None:
+        if bundle.optimize == optimize and not bundle.stale(sources): return bundle
+        bundle.close()
+
+    buildBundle(path, sources, optimize)
+    return Bundle(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('bundle', help='bundle file to write')
+    parser.add_argument('sources', nargs='+', help='.fun files to compile into it')
+    parser.add_argument('-O', '--optimize', action='store_true')
+    args = parser.parse_args(argv)
+
+    count = buildBundle(args.bundle, args.sources, args.optimize)
+    print(f'{count} files, {os.path.getsize(args.bundle):,} bytes', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,110 @@
+import time
+import asyncio
+from itertools import repeat
+
+from language.errors import RunTimeError
+from language.results import RuntimeResult
+from language.iterative import IterativeInterpreter
+from language.adaptive import EvaluationFailure
+
+# Nodes evaluated between two yields to the event loop
+YIELD_EVERY = 1000
+
+
+# ===========================
+# STALL METRICS
+# ===========================
+class StallMetrics:
+    """
+    How long evaluations held the event loop: a stall is the time spent
+    between two yields, parsing included, so `max_stall` is the longest
+    the loop was kept from serving anything else.
+    """
+
+    def __init__(self):
+        self.evaluations = 0
+        self.yields = 0
+        self.busy = 0.0
+        self.max_stall = 0.0
+
+    def record(self, stall):
+        self.busy += stall
+        if stall > self.max_stall: self.max_stall = stall
+
+    def asDict(self):
+        return {
+            'evaluations': self.evaluations,
+            'yields': self.yields,
+            'busy': self.busy,
+            'max_stall': self.max_stall,
+            'mean_stall': self.busy / (self.yields + self.evaluations) if self.evaluations else 0.0,
+        }
+
+
+STALLS = StallMetrics()
+
+
+# ===========================
+# ASYNC INTERPRETER
+# ===========================
+class AsyncInterpreter(IterativeInterpreter):
+    """
+    Iterative tree walker for event loops: every `every` nodes it awaits
+    asyncio.sleep(0), so other tasks run in between, however long the
+    program takes.
+
+    Past `deadline`, a loop.time() value, or once `cancel` is set, the
+    evaluation stops at the node it reached with a RunTimeError. These are
+    checked each time it yields. Cancelling the task itself raises
+    CancelledError as usual.
+    """
+
+    def __init__(self, context, every=YIELD_EVERY, deadline=None, cancel: asyncio.Event = None, metrics=STALLS,
+                 start=None):
+        super().__init__(context)
+        self.every = every
+        self.deadline = deadline
+        self.cancel = cancel
+        self.metrics = metrics
+        # When the work the first stall is made of began, parsing included
+        self.slice_start = time.perf_counter() if start is None else start
+
+    async def visitAsync(self, node):
+        try:
+            value = await self.evaluateAsync(node)
+            if value is None: return RuntimeResult().success(None)
+            return RuntimeResult().success(self.box(value, node))
+        except EvaluationFailure as failure:
+            return RuntimeResult().failure(RunTimeError(
+                self.context, failure.details,
+                failure.node.pos_start, failure.node.pos_end
+            ))
+        finally:
+            self.metrics.record(time.perf_counter() - self.slice_start)
+            self.metrics.evaluations += 1
+            self.taken.clear()
+
+    def check(self, node):
+        if self.cancel is not None and self.cancel.is_set():
+            raise EvaluationFailure(node, 'Evaluation cancelled')
+        if self.deadline is not None and asyncio.get_running_loop().time() > self.deadline:
+            raise EvaluationFailure(node, 'Evaluation ran past its deadline')
+
+    async def pause(self, node):
+        self.metrics.record(time.perf_counter() - self.slice_start)
+        self.metrics.yields += 1
+        self.check(node)
+
+        await asyncio.sleep(0)
+
+        self.slice_start = time.perf_counter()
+        self.check(node)
+
+    async def evaluateAsync(self, root):
+        # The loop of IterativeInterpreter, run `every` nodes at a time with a pause in between
+        stack = [(root, 0)]
+        values = []
+        while True:
+            node = self.run(stack, values, repeat(None, self.every))
+            if not stack: return values.pop()
+            await self.pause(node)
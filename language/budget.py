@@ -0,0 +1,248 @@
+import math
+import time
+
+from language.nodes import *
+from language.errors import BudgetError
+from language.tokens import TokenType
+from language.results import RuntimeResult
+from language.resolver import childrenOf
+from language.unboxed import UnboxedInterpreter
+
+# Assumed magnitude, in bits, of variables the estimator knows nothing about
+UNKNOWN_BITS = 64
+
+# Operations between two checks of the clock
+CLOCK_EVERY = 256
+
+
+# ===========================
+# COST ESTIMATE
+# ===========================
+class CostEstimate:
+    def __init__(self):
+        self.nodes = 0
+        self.bits = 0
+        self.node = None
+
+    def asDict(self):
+        return {'nodes': self.nodes, 'bits': self.bits}
+
+
+def bitsText(bits):
+    if bits < 1e15: return str(bits)
+    # Ints past the range of floats are shown by their own bit length
+    if isinstance(bits, int) and bits.bit_length() > 1000: return f'2^{bits.bit_length() - 1}'
+    return f'{float(bits):.3g}'
+
+
+def magnitudeOf(value):
+    # log2 of the magnitude of a number, and whether it is an int
+    if value == 0: return 0.0, isinstance(value, int)
+    if isinstance(value, int): return math.log2(abs(value)), True
+    return min(math.log2(abs(value)), 1024.0), False
+
+
+def estimateCost(root, symbols=None, max_bits=None) -> CostEstimate:
+    """
+    Bounds, without running it, the number of nodes a program evaluates and
+    the bit length of the largest int it can produce, from the numbers in it
+    and, for variables, their values in `symbols`.
+
+    Each node is evaluated at most once, so the node count also bounds the
+    operations run. Magnitudes are tracked as log2 upper bounds, so the
+    bits of a tower of powers come out as a float, possibly inf, instead of
+    being computed. Floats never grow past 1024 bits, so only ints count.
+    `node` is the first node found over `max_bits`, or the largest one.
+    """
+
+    estimate = CostEstimate()
+    assigned = {}
+    bounds = {}
+    largest = -1.0
+
+    # Children pushed left to right are popped right to left, so reversing
+    # this preorder gives a post-order in evaluation order, where
+    # assignments are seen before the reads after them
+    order = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        stack.extend(childrenOf(node))
+
+    estimate.nodes = len(order)
+    for node in reversed(order):
+        kind = node.__class__
+
+        if kind is NumberNode:
+            bound = magnitudeOf(node.token.value)
+
+        elif kind is VarAccessNode:
+            var = node.var_name.value
+            bound = assigned.get(var)
+            if bound is None:
+                value = symbols.get(var) if symbols is not None else None
+                bound = magnitudeOf(value.value) if value is not None else (float(UNKNOWN_BITS), True)
+
+        elif kind is UnaryOpNode:
+            bound = bounds[node.node]
+
+        elif kind is VarAssignNode:
+            bound = bounds[node.value]
+            var = node.var_name.value
+            previous = assigned.get(var, bound)
+            assigned[var] = (max(previous[0], bound[0]), previous[1] and bound[1])
+
+        elif kind is BinaryOpNode:
+            (left, left_int), (right, right_int) = bounds[node.left], bounds[node.right]
+            is_int = left_int and right_int
+            token_type = node.operator.token_type
+
+            if token_type in (TokenType.PLUS, TokenType.MINUS):
+                bound = (max(left, right) + 1, is_int)
+            elif token_type == TokenType.MULTIPLY:
+                bound = (left + right, is_int)
+            elif token_type == TokenType.DIVIDE:
+                bound = (min(left + 1075, 1024.0), False)
+            elif token_type == TokenType.POWER:
+                # |a ^ b| <= 2 ^ (log2|a| * |b|), with |b| <= 2 ^ log2|b|
+                power = left * 2.0 ** min(right, 1000.0) if left else 0.0
+                bound = (power, True) if is_int else (min(power, 1024.0), False)
+            else:
+                # Comparisons and logic give 0 or 1
+                bound = (0.0, True)
+
+        else:
+            branches = [bounds[expr] for _, expr in node.cases]
+            if node.else_case: branches.append(bounds[node.else_case])
+            bound = (max(value for value, _ in branches), all(is_int for _, is_int in branches))
+
+        bounds[node] = bound
+        if bound[1] and bound[0] >= largest:
+            # Past the limit, the node that first went over it is kept
+            if max_bits is None or largest <= max_bits - 1:
+                estimate.node = node
+            largest = bound[0]
+
+    estimate.bits = math.ceil(largest) + 1 if largest < math.inf else math.inf
+    return estimate
+
+
+# ===========================
+# BUDGET
+# ===========================
+class BudgetFailure(Exception):
+    def __init__(self, node, details):
+        super().__init__(details)
+        self.node = node
+        self.details = details
+
+
+class Budget:
+    """
+    Limits on one evaluation. Each limit left as None is not enforced.
+
+    Before running, the program's estimated cost is checked against the
+    node and bit limits when `estimate` is set, and a program that could
+    exceed them is rejected without running. While running, the operations
+    evaluated, the bit length of every int result, checked before it is
+    computed, and the wall-clock time are all held to their limits. Either
+    way the failure is a BudgetError pointing at the node responsible.
+    """
+
+    def __init__(self, max_operations=None, max_bits=None, max_seconds=None, max_nodes=None, estimate=True):
+        self.max_operations = max_operations
+        self.max_bits = max_bits
+        self.max_seconds = max_seconds
+        self.max_nodes = max_nodes
+        self.estimate = estimate
+
+    def check(self, node, context):
+        estimate = estimateCost(node, context.symbol_table, self.max_bits)
+
+        nodes = min(limit for limit in (self.max_nodes, self.max_operations, math.inf) if limit is not None)
+        if estimate.nodes > nodes:
+            return BudgetError(
+                context, f'Program has {estimate.nodes} nodes, more than {nodes} allowed',
+                node.pos_start, node.pos_end
+            )
+
+        if self.max_bits is not None and estimate.bits > self.max_bits:
+            return BudgetError(
+                context, f'Result may need up to {bitsText(estimate.bits)} bits, more than {self.max_bits} allowed',
+                estimate.node.pos_start, estimate.node.pos_end
+            )
+
+        return None
+
+    def run(self, node, context) -> RuntimeResult:
+        if self.estimate:
+            error = self.check(node, context)
+            if error: return RuntimeResult().failure(error)
+
+        return BudgetInterpreter(context, self).visit(node)
+
+
+# ===========================
+# BUDGET INTERPRETER
+# ===========================
+class BudgetInterpreter(UnboxedInterpreter):
+    def __init__(self, context, budget: Budget):
+        super().__init__(context)
+        self.budget = budget
+        self.max_operations = math.inf if budget.max_operations is None else budget.max_operations
+        self.max_bits = math.inf if budget.max_bits is None else budget.max_bits
+        self.operations = 0
+        self.deadline = math.inf
+
+    def visit(self, node):
+        self.operations = 0
+        if self.budget.max_seconds is not None:
+            self.deadline = time.perf_counter() + self.budget.max_seconds
+
+        try:
+            return super().visit(node)
+        except BudgetFailure as failure:
+            return RuntimeResult().failure(BudgetError(
+                self.context, failure.details,
+                failure.node.pos_start, failure.node.pos_end
+            ))
+        except RecursionError:
+            return RuntimeResult().failure(BudgetError(
+                self.context, 'Program is nested too deeply',
+                node.pos_start, node.pos_end
+            ))
+
+    def evaluate(self, node):
+        self.operations += 1
+        if self.operations > self.max_operations:
+            raise BudgetFailure(node, f'More than {self.budget.max_operations} operations')
+
+        if self.operations % CLOCK_EVERY == 0 and time.perf_counter() > self.deadline:
+            raise BudgetFailure(node, f'Ran for more than {self.budget.max_seconds}s')
+
+        return self.methods[node.__class__](node)
+
+    def operate(self, node, left, right):
+        if type(left) is int and type(right) is int:
+            bits = self.bitsOf(node.operator.token_type, left, right)
+            if bits > self.max_bits:
+                raise BudgetFailure(node, f'Result would need about {bitsText(bits)} bits, more than {self.budget.max_bits} allowed')
+
+        try: return super().operate(node, left, right)
+        except OverflowError:
+            raise BudgetFailure(node, 'Result is too large for a float')
+
+    @staticmethod
+    def bitsOf(token_type, left, right):
+        # Upper bound on the bit length of an int result, found without computing it
+        if token_type == TokenType.POWER:
+            if right <= 0 or abs(left) <= 1: return 1
+            # Exponents too large for a float are bounded in ints, a bit more loosely
+            if right.bit_length() > 64: return abs(left).bit_length() * right
+            return math.ceil(math.log2(abs(left)) * right) + 1
+        if token_type == TokenType.MULTIPLY:
+            return left.bit_length() + right.bit_length()
+        if token_type in (TokenType.PLUS, TokenType.MINUS):
+            return max(left.bit_length(), right.bit_length()) + 1
+        return 1
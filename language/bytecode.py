@@ -0,0 +1,370 @@
+from array import array
+from enum import IntEnum
+
+from language.utils import Position, LineIndex
+from language.datatypes import Number
+from language.nodes import *
+from language.errors import RunTimeError
+from language.tokens import TokenType, Keyword, slotOf
+from language.results import RuntimeResult
+
+
+# ===========================
+# OPCODES
+# ===========================
+class OpCode(IntEnum):
+    LOAD_CONST = 0
+    LOAD_NAME = 1
+    STORE_NAME = 2
+    NEGATE = 3
+
+    ADD = 4
+    SUB = 5
+    MUL = 6
+    DIV = 7
+    POW = 8
+
+    EQ = 9
+    NE = 10
+    LT = 11
+    LE = 12
+    GT = 13
+    GE = 14
+
+    AND = 15
+    OR = 16
+
+    JUMP = 17
+    JUMP_IF_FALSE = 18
+    MARK = 19
+
+
+BINARY_OPCODES = {
+    TokenType.PLUS: OpCode.ADD,
+    TokenType.MINUS: OpCode.SUB,
+    TokenType.MULTIPLY: OpCode.MUL,
+    TokenType.DIVIDE: OpCode.DIV,
+    TokenType.POWER: OpCode.POW,
+
+    TokenType.EQUAL: OpCode.EQ,
+    TokenType.NOT_EQUAL: OpCode.NE,
+    TokenType.LESS_THAN: OpCode.LT,
+    TokenType.LESS_THAN_EQUAL: OpCode.LE,
+    TokenType.GREATER_THAN: OpCode.GT,
+    TokenType.GREATER_THAN_EQUAL: OpCode.GE,
+
+    Keyword.AND: OpCode.AND,
+    Keyword.OR: OpCode.OR,
+}
+
+
+# ===========================
+# BYTECODE
+# ===========================
+class Bytecode:
+    """
+    Flat instruction stream produced by the Compiler.
+
+    Every instruction takes two slots in `ops`: the opcode and its argument.
+    LOAD_CONST indexes `consts`; every other argument indexes a site, whose
+    variable name, resolved slot and (pos_start, pos_end) are kept in
+    `names`/`slots`/`positions` so runtime errors point at the same source as
+    the tree walker's.
+    """
+
+    def __init__(self, ops, consts, names, slots, positions, pos_start, pos_end):
+        self.ops = ops
+        self.consts = consts
+        self.names = names
+        self.slots = slots
+        self.positions = positions
+        self.pos_start = pos_start
+        self.pos_end = pos_end
+
+    def __getstate__(self):
+        # Every position points into the same source, so only their offsets
+        # are kept, and slots, which are rebuilt from the names, are dropped
+        offsets = array('q', [pos.index for site in self.positions for pos in site])
+        source = (self.pos_start.filename, self.pos_start.text, self.pos_start.index, self.pos_end.index)
+        return self.ops, self.consts, self.names, offsets, source
+
+    def __setstate__(self, state):
+        self.ops, self.consts, self.names, offsets, (filename, text, start, end) = state
+        self.slots = [None if name is None else slotOf(name) for name in self.names]
+
+        self.positions = SitePositions(filename, text, offsets)
+        self.pos_start, self.pos_end = self.positions.position(start), self.positions.position(end)
+
+    def disassemble(self):
+        lines = []
+        for pc in range(0, len(self.ops), 2):
+            op, arg = OpCode(self.ops[pc]), self.ops[pc + 1]
+
+            if op == OpCode.LOAD_CONST: detail = f'({self.consts[arg]})'
+            elif op in (OpCode.LOAD_NAME, OpCode.STORE_NAME): detail = f'({self.names[arg]})'
+            else: detail = ''
+
+            lines.append(f'{pc:>5} {op.name:<14} {arg} {detail}'.rstrip())
+        return '\n'.join(lines)
+
+
+class SitePositions:
+    """
+    The (pos_start, pos_end) of every site of an unpickled Bytecode, built
+    from their source offsets only when an error or an assignment needs one.
+    """
+
+    __slots__ = ('filename', 'text', 'offsets', 'lines', 'built')
+
+    def __init__(self, filename, text, offsets):
+        self.filename = filename
+        self.text = text
+        self.offsets = offsets
+        self.lines = None
+        self.built = {}
+
+    def __len__(self):
+        return len(self.offsets) // 2
+
+    def __getitem__(self, site):
+        if not 0 <= site < len(self): raise IndexError(site)
+        return self.position(self.offsets[2 * site]), self.position(self.offsets[2 * site + 1])
+
+    def position(self, index):
+        position = self.built.get(index)
+        if position is None:
+            if self.lines is None: self.lines = LineIndex(self.text)
+            line = self.lines.lineOf(index)
+            position = self.built[index] = Position(
+                self.filename, self.text, index, line, self.lines.columnOf(index, line), self.lines
+            )
+        return position
+
+
+# ===========================
+# COMPILER
+# ===========================
+def valueOrigin(node):
+    # The value of an assignment carries the position of its right hand side.
+    # The value of a condition carries whichever branch ran, which is only
+    # known at runtime, so None is returned for those.
+    while isinstance(node, VarAssignNode):
+        node = node.value
+    return None if isinstance(node, ConditionsNode) else node
+
+
+def compileTree(node) -> Bytecode:
+    return Compiler().compile(node)
+
+
+class Compiler:
+    def __init__(self):
+        self.ops = array('l')
+        self.consts = []
+        self.names = []
+        self.slots = []
+        self.positions = []
+        self.marking = False
+
+    def compile(self, node) -> Bytecode:
+        self.visit(node)
+        return Bytecode(self.ops, self.consts, self.names, self.slots, self.positions, node.pos_start, node.pos_end)
+
+    def emit(self, op, arg=0):
+        self.ops.append(op)
+        self.ops.append(arg)
+        return len(self.ops) - 1
+
+    def patch(self, slot):
+        self.ops[slot] = len(self.ops)
+
+    def addSite(self, node, name=None, slot=None):
+        self.names.append(name)
+        self.slots.append(slot)
+        self.positions.append((node.pos_start, node.pos_end))
+        return len(self.positions) - 1
+
+    def visit(self, node):
+        name = f'compile{type(node).__name__}'
+        method = getattr(self, name)
+        return method(node)
+
+    def compileNumberNode(self, node: NumberNode):
+        self.consts.append(node.token.value)
+        self.emit(OpCode.LOAD_CONST, len(self.consts) - 1)
+
+    def compileUnaryOpNode(self, node: UnaryOpNode):
+        self.visit(node.node)
+        if node.operator.token_type == TokenType.MINUS:
+            self.emit(OpCode.NEGATE)
+
+    def compileBinaryOpNode(self, node: BinaryOpNode):
+        op = BINARY_OPCODES.get(node.operator.token_type) or BINARY_OPCODES[node.operator.value]
+        self.visit(node.left)
+
+        if op != OpCode.DIV:
+            self.visit(node.right)
+            self.emit(op)
+            return
+
+        # Division by zero is reported at the right operand, so DIV carries its
+        # position. When that operand is a condition, each branch MARKs its own.
+        origin = valueOrigin(node.right)
+        if origin:
+            self.visit(node.right)
+            self.emit(op, self.addSite(origin))
+            return
+
+        marking, self.marking = self.marking, True
+        self.visit(node.right)
+        self.marking = marking
+        self.emit(op, -1)
+
+    def compileVarAccessNode(self, node: VarAccessNode):
+        self.emit(OpCode.LOAD_NAME, self.addSite(node, node.var_name.value, node.slot))
+
+    def compileVarAssignNode(self, node: VarAssignNode):
+        self.visit(node.value)
+        self.emit(OpCode.STORE_NAME, self.addSite(node.value, node.var_name.value, node.slot))
+
+    def compileConditionsNode(self, node: ConditionsNode):
+        marking, self.marking = self.marking, False
+        exits = []
+
+        for cond, expr in node.cases:
+            self.visit(cond)
+            skip = self.emit(OpCode.JUMP_IF_FALSE)
+
+            self.marking = marking
+            self.visit(expr)
+            if marking and valueOrigin(expr):
+                self.emit(OpCode.MARK, self.addSite(valueOrigin(expr)))
+            self.marking = False
+
+            exits.append(self.emit(OpCode.JUMP))
+            self.patch(skip)
+
+        self.marking = marking
+        if node.else_case:
+            self.visit(node.else_case)
+            if marking and valueOrigin(node.else_case):
+                self.emit(OpCode.MARK, self.addSite(valueOrigin(node.else_case)))
+        else:
+            self.consts.append(None)
+            self.emit(OpCode.LOAD_CONST, len(self.consts) - 1)
+
+        for slot in exits:
+            self.patch(slot)
+
+
+# ===========================
+# VIRTUAL MACHINE
+# ===========================
+class VM:
+    def __init__(self, context):
+        self.context = context
+
+    def run(self, code: Bytecode):
+        # Plain ints: comparing against IntEnum members costs a lot in this loop
+        LOAD_CONST, LOAD_NAME, STORE_NAME, NEGATE = 0, 1, 2, 3
+        ADD, SUB, MUL, DIV, POW = 4, 5, 6, 7, 8
+        EQ, NE, LT, LE, GT, GE = 9, 10, 11, 12, 13, 14
+        AND, OR = 15, 16
+        JUMP, JUMP_IF_FALSE, MARK = 17, 18, 19
+
+        ops, consts, names, slots, positions = code.ops, code.consts, code.names, code.slots, code.positions
+        symbols = self.context.symbol_table
+        # Stays current: the table only ever changes this dict in place
+        values = symbols.values
+        stack = []
+        push, pop = stack.append, stack.pop
+
+        pc, end, mark = 0, len(ops), -1
+        while pc < end:
+            op, arg = ops[pc], ops[pc + 1]
+            pc += 2
+
+            if op == LOAD_CONST:
+                push(consts[arg])
+            elif op == LOAD_NAME:
+                try:
+                    value = values[slots[arg]]
+                except KeyError:
+                    value = None
+
+                if value is None:
+                    # Unresolved trees, variables missing here and parent tables
+                    value = symbols.get(names[arg])
+                if value is None:
+                    return self.failure(code, arg, f'{names[arg]} is not defined!')
+                push(value.value)
+            elif op == MARK:
+                mark = arg
+
+            elif op == ADD:
+                right = pop()
+                stack[-1] = stack[-1] + right
+            elif op == SUB:
+                right = pop()
+                stack[-1] = stack[-1] - right
+            elif op == MUL:
+                right = pop()
+                stack[-1] = stack[-1] * right
+            elif op == DIV:
+                right = pop()
+                if right == 0:
+                    return self.failure(code, mark if arg < 0 else arg, 'Division by zero not defined')
+                stack[-1] = stack[-1] / right
+            elif op == POW:
+                right = pop()
+                stack[-1] = stack[-1] ** right
+            elif op == NEGATE:
+                stack[-1] = -stack[-1]
+
+            elif op == JUMP_IF_FALSE:
+                if pop() == 0: pc = arg
+            elif op == JUMP:
+                pc = arg
+
+            elif op == EQ:
+                right = pop()
+                stack[-1] = int(stack[-1] == right)
+            elif op == NE:
+                right = pop()
+                stack[-1] = int(stack[-1] != right)
+            elif op == LT:
+                right = pop()
+                stack[-1] = int(stack[-1] < right)
+            elif op == LE:
+                right = pop()
+                stack[-1] = int(stack[-1] <= right)
+            elif op == GT:
+                right = pop()
+                stack[-1] = int(stack[-1] > right)
+            elif op == GE:
+                right = pop()
+                stack[-1] = int(stack[-1] >= right)
+            elif op == AND:
+                right = pop()
+                stack[-1] = int(stack[-1] and right)
+            elif op == OR:
+                right = pop()
+                stack[-1] = int(stack[-1] or right)
+
+            elif op == STORE_NAME:
+                value = stack[-1]
+                if value is not None:
+                    pos_start, pos_end = positions[arg]
+                    value = Number(value, pos_start, pos_end, self.context)
+                if slots[arg] is None:
+                    symbols.set(names[arg], value)
+                else:
+                    symbols.store(slots[arg], value)
+
+        value = pop()
+        if value is None: return RuntimeResult().success(None)
+        return RuntimeResult().success(Number(value, code.pos_start, code.pos_end, self.context))
+
+    def failure(self, code, site, details):
+        pos_start, pos_end = code.positions[site]
+        return RuntimeResult().failure(RunTimeError(self.context, details, pos_start, pos_end))
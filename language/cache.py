@@ -0,0 +1,162 @@
+import sys
+import threading
+from enum import Enum
+from collections import OrderedDict
+
+from language.parsing import LEXERS, PARSERS
+from language.optimizer import Optimizer
+from language.resolver import resolve
+
+
+def parseSource(filename, text, optimize=False, lexer='regex', parser='recursive'):
+    if lexer not in LEXERS:
+        raise ValueError(f'Unknown lexer {lexer!r}, expected one of {tuple(LEXERS)}')
+    if parser not in PARSERS:
+        raise ValueError(f'Unknown parser {parser!r}, expected one of {tuple(PARSERS)}')
+
+    tokens, error = LEXERS[lexer](filename, text).tokenize()
+    if error: return None, error
+
+    res = PARSERS[parser](tokens).parse()
+    if res.error: return None, res.error
+
+    node = Optimizer().optimize(res.value) if optimize else res.value
+    return resolve(node), None
+
+
+def slotValues(obj):
+    # Reads slots through their own descriptors, so subclass properties that
+    # compute a value on first access are not triggered
+    for cls in type(obj).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            try:
+                yield cls.__dict__[name].__get__(obj, cls)
+            except AttributeError:
+                pass
+
+
+def footprint(root, text):
+    """
+    Rough number of bytes held by a parsed tree or error, counting every node,
+    token and position reachable from `root` once, plus the source text.
+    """
+
+    size = sys.getsizeof(text)
+    seen = set()
+    stack = [root]
+
+    while stack:
+        obj = stack.pop()
+        if obj is None or obj is text or id(obj) in seen or isinstance(obj, Enum):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+
+        if isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+        elif hasattr(obj, '__dict__'):
+            stack.extend(vars(obj).values())
+        elif hasattr(obj, '__slots__'):
+            stack.extend(slotValues(obj))
+
+    return size
+
+
+# ===========================
+# PARSE CACHE
+# ===========================
+class ParseCache:
+    """
+    Thread-safe LRU cache from (filename, text) to the parsed tree, or to the
+    lexing or syntax error that text produced.
+
+    Entries are evicted least recently used first once there are more than
+    `capacity` of them or their estimated footprint exceeds `max_bytes`.
+    Cached trees are shared between callers, so they must never be mutated.
+    What engines build from a tree, such as its bytecode or its Shapes, can
+    be attached to its entry and is evicted along with it.
+    """
+
+    def __init__(self, capacity=1024, max_bytes=64 * 1024 * 1024):
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def parse(self, filename, text, optimize=False, lexer='regex', parser='recursive'):
+        # Every lexer and parser produces the same tree, so neither is part of the key
+        key = (filename, text, optimize)
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0], entry[1]
+            self.misses += 1
+
+        node, error = parseSource(filename, text, optimize, lexer, parser)
+        self.store(key, node, error)
+        return node, error
+
+    def store(self, key, node, error):
+        size = footprint(error or node, key[1])
+        if size > self.max_bytes: return
+
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None: self.bytes -= old[2]
+
+            self.entries[key] = (node, error, size, {})
+            self.bytes += size
+
+            while len(self.entries) > self.capacity or self.bytes > self.max_bytes:
+                _, (_, _, evicted, _) = self.entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def attached(self, node, kind, build, filename, text, optimize=False):
+        """
+        What `build(node)` makes of a tree parse returned for these arguments,
+        built once and kept with its entry under `kind`. Trees that are not
+        in the cache, or no longer, are built from every time.
+        """
+
+        key = (filename, text, optimize)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] is not node: entry = None
+            built = None if entry is None else entry[3].get(kind)
+        if built is not None: return built
+
+        built = build(node)
+        if entry is None: return built
+        with self.lock:
+            return entry[3].setdefault(kind, built)
+
+    def invalidate(self, filename=None, text=None):
+        # Drops one source, every source of a file, or with no arguments everything
+        with self.lock:
+            keys = [
+                key for key in self.entries
+                if (filename is None or key[0] == filename) and (text is None or key[1] == text)
+            ]
+            for key in keys:
+                self.bytes -= self.entries.pop(key)[2]
+            return len(keys)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
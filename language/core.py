@@ -1,18 +1,191 @@
-from language.utils import Context
+import time
+import asyncio
+from copy import copy
+from concurrent.futures import ThreadPoolExecutor
+
+from language.utils import Context, readLines
 from language.tokens import SymbolTable
-from language.parsing import Lexer, Parser, Interpreter
+from language.parsing import Interpreter
+from language.bytecode import VM, compileTree
+from language.transpiler import CodeCache, compileSource
+from language.adaptive import AdaptiveInterpreter
+from language.unboxed import UnboxedInterpreter
+from language.iterative import IterativeInterpreter
+from language.reactive import ReactiveInterpreter
+from language.hashcons import MemoInterpreter, shapesOf
+from language.budget import Budget
+from language.asynchronous import AsyncInterpreter, YIELD_EVERY, STALLS
+from language.vectorized import BatchInterpreter
+from language.results import BatchResult
+from language.errors import ErrorBase
+from language.cache import ParseCache, parseSource
 
 GLOBALS = SymbolTable()
+ENGINES = ('tree', 'vm', 'python', 'adaptive', 'unboxed', 'iterative', 'reactive', 'memo')
+
+PARSE_CACHE = ParseCache()
+
+# Replace with CodeCache(directory=...) to keep compiled programs across restarts
+CODE_CACHE = CodeCache()
+
+# Long-lived, with its executable trees kept alongside the cached trees so
+# they keep their specializations between calls
+ADAPTIVE = AdaptiveInterpreter(Context('<MAIN>', symbol_table=GLOBALS))
+
+# Longer texts are parsed off the event loop by interpretAsync, on one
+# thread, as more of them would only compete with the loop for the GIL
+PARSE_INLINE = 4096
+PARSE_THREAD = ThreadPoolExecutor(max_workers=1)
 
+# Long-lived so its dependency graph spans calls
+REACTIVE = ReactiveInterpreter(Context('<MAIN>', symbol_table=GLOBALS))
 
-def interpret(filename: str, text: str):
-    tokens, error = Lexer(filename, text).tokenize()
+# What engines build from a tree before running it, kept alongside cached trees
+PREPARE = {'vm': compileTree, 'memo': shapesOf}
+
+
+def interpret(filename: str, text: str, engine: str = 'tree', optimize: bool = False, use_cache: bool = True,
+              lexer: str = 'regex', parser: str = 'recursive', budget: Budget = None):
+    if engine not in ENGINES:
+        raise ValueError(f'Unknown engine {engine!r}, expected one of {ENGINES}')
+
+    context = Context('<MAIN>', symbol_table=GLOBALS)
+    if engine == 'python' and budget is None:
+        if use_cache:
+            program, error = CODE_CACHE.load(filename, text, optimize, lexer, parser)
+        else:
+            program, error = compileSource(filename, text, optimize, lexer, parser)
+        if error: return error
+
+        res = program.run(context, filename, text)
+        if res.error: return res.error
+        return res.value
+
+    if use_cache:
+        node, error = PARSE_CACHE.parse(filename, text, optimize, lexer, parser)
+    else:
+        node, error = parseSource(filename, text, optimize, lexer, parser)
     if error: return error
 
-    res = Parser(tokens).parse()
+    # Budgets are enforced by an interpreter of their own, whichever engine was asked for
+    if budget is not None:
+        res = budget.run(node, context)
+    elif engine == 'adaptive':
+        executable = None
+        if use_cache: executable = PARSE_CACHE.attached(node, 'adaptive', ADAPTIVE.build, filename, text, optimize)
+        res = ADAPTIVE.visit(node, executable)
+    elif engine == 'reactive':
+        res = REACTIVE.visit(node)
+    else:
+        prepared = None
+        if use_cache and engine in PREPARE:
+            prepared = PARSE_CACHE.attached(node, engine, PREPARE[engine], filename, text, optimize)
+        res = runTree(engine, node, context, prepared)
+
     if res.error: return res.error
+    return res.value
 
-    context = Context('<MAIN>', symbol_table=GLOBALS)
-    res = Interpreter(context).visit(res.value)
+
+def runTree(engine: str, node, context, prepared=None):
+    # Engines that keep nothing between calls, so any number of them can run at once.
+    # `prepared` is what PREPARE built from `node` earlier, when it was kept.
+    if engine == 'vm':
+        return VM(context).run(compileTree(node) if prepared is None else prepared)
+    if engine == 'unboxed':
+        return UnboxedInterpreter(context).visit(node)
+    if engine == 'iterative':
+        return IterativeInterpreter(context).visit(node)
+    if engine == 'memo':
+        return MemoInterpreter(context).visit(node, prepared)
+    return Interpreter(context).visit(node)
+
+
+async def interpretAsync(filename: str, text: str, optimize: bool = False, use_cache: bool = True,
+                         lexer: str = 'regex', parser: str = 'recursive', timeout: float = None,
+                         cancel=None, every: int = YIELD_EVERY, metrics=STALLS, symbols: SymbolTable = None,
+                         budget: Budget = None):
+    """
+    Coroutine counterpart of interpret, evaluated by an AsyncInterpreter so
+    long programs yield to the event loop every `every` nodes.
+
+    Past `timeout` seconds, or once the asyncio.Event `cancel` is set, the
+    evaluation stops with a RunTimeError pointing at the node it reached.
+    Concurrent evaluations share the global symbol table like any others,
+    unless given `symbols` of their own.
+
+    A single operation cannot yield, so with a `budget` the program's
+    estimated cost is always checked first, and a program whose node count
+    or ints could exceed its limits is rejected before it runs. Time is
+    bounded by `timeout` instead of the budget's `max_seconds`.
+    """
+
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    parse = PARSE_CACHE.parse if use_cache else parseSource
+    start = time.perf_counter()
+    if len(text) > PARSE_INLINE:
+        # Parsed on a thread, so a long program does not stall the loop
+        node, error = await loop.run_in_executor(PARSE_THREAD, parse, filename, text, optimize, lexer, parser)
+        start = time.perf_counter()
+    else:
+        node, error = parse(filename, text, optimize, lexer, parser)
+    if error: return error
+
+    context = Context('<MAIN>', symbol_table=GLOBALS if symbols is None else symbols)
+    if budget is not None:
+        error = budget.check(node, context)
+        if error: return error
+
+    interpreter = AsyncInterpreter(context, every, deadline, cancel, metrics, start)
+    res = await interpreter.visitAsync(node)
     if res.error: return res.error
     return res.value
+
+
+def interpretBatch(filename: str, text: str, columns: dict, optimize: bool = False, use_cache: bool = True,
+                   lexer: str = 'regex', parser: str = 'recursive') -> BatchResult:
+    if use_cache:
+        node, error = PARSE_CACHE.parse(filename, text, optimize, lexer, parser)
+    else:
+        node, error = parseSource(filename, text, optimize, lexer, parser)
+    if error: return BatchResult().failure(error)
+
+    context = Context('<MAIN>', symbol_table=GLOBALS)
+    return BatchInterpreter(context, columns).visit(node)
+
+
+def atLine(error, line_no):
+    # Statements are lexed on their own, so their positions start on line 0.
+    # Copied, as the error may be one the parse cache hands out again.
+    error = copy(error)
+    for attr in ('pos_start', 'pos_end'):
+        pos = getattr(error, attr).copy()
+        pos.line_no += line_no
+        setattr(error, attr, pos)
+    return error
+
+
+def interpretScript(filename: str, source, engine: str = 'tree', optimize: bool = False, use_cache: bool = False,
+                    lexer: str = 'regex', parser: str = 'recursive'):
+    """
+    Runs a script of newline separated statements, yielding what interpret
+    gives for each one as soon as it has run. Stops after the first error.
+
+    `source` is a path or a binary file. The file is memory-mapped when
+    possible and read a line at a time, so only the current statement is
+    held in memory.
+    """
+
+    file = open(source, 'rb') if isinstance(source, str) else source
+    try:
+        for line_no, line in enumerate(readLines(file)):
+            text = line.rstrip('\r\n')
+            if not text.strip(' \t'): continue
+
+            result = interpret(filename, text, engine, optimize, use_cache, lexer, parser)
+            if isinstance(result, ErrorBase):
+                yield atLine(result, line_no)
+                return
+            yield result
+    finally:
+        if file is not source: file.close()
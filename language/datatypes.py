@@ -3,6 +3,8 @@ from language.errors import RunTimeError
 
 
 class Number:
+    __slots__ = ('value', 'pos_start', 'pos_end', 'context')
+
     def __init__(self, value, pos_start=None, pos_end=None, context=None):
         self.value = value
         self.pos_start = pos_start
@@ -0,0 +1,100 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from language.utils import Context
+from language.tokens import SymbolTable, Keyword
+from language.datatypes import Number
+from language.transpiler import CodeCache
+from language.cache import ParseCache
+from language.core import ENGINES, PREPARE, runTree
+
+# Engines whose interpreters outlive a call, tied to one symbol table
+STATEFUL = ('adaptive', 'reactive')
+
+
+# ===========================
+# ENGINE
+# ===========================
+class Engine:
+    """
+    An interpreter with state of its own: global variables, configuration
+    and parse and code caches, the bytecode or Shapes built from each cached
+    tree included. Engines never see each other's variables, trees or
+    errors and share no locks, so any number of them can run side by side
+    on threads.
+
+    Within one engine, programs that only read run concurrently, without a
+    lock, on the variables as they were when they started. Programs that
+    assign run one at a time, each on a copy of the variables that takes
+    their place once it finishes, errors included, so a reader sees all of
+    a program's assignments or none of them. Texts without the `soch`
+    keyword are the ones that only read.
+    """
+
+    def __init__(self, engine='tree', optimize=False, lexer='regex', parser='recursive',
+                 cache_size=1024, code_directory=None):
+        if engine not in ENGINES or engine in STATEFUL:
+            choices = tuple(name for name in ENGINES if name not in STATEFUL)
+            raise ValueError(f'Unknown engine {engine!r}, expected one of {choices}')
+
+        self.engine = engine
+        self.optimize = optimize
+        self.lexer = lexer
+        self.parser = parser
+
+        self.symbols = SymbolTable()
+        self.parse_cache = ParseCache(cache_size)
+        self.code_cache = CodeCache(cache_size, code_directory)
+        self.write_lock = threading.Lock()
+
+    def interpret(self, text: str, filename: str = '<engine>'):
+        if Keyword.ASSIGN_START.value not in text:
+            return self.evaluate(filename, text, self.symbols)
+
+        with self.write_lock:
+            symbols = self.symbols.copy()
+            result = self.evaluate(filename, text, symbols)
+            self.symbols = symbols
+        return result
+
+    def evaluate(self, filename, text, symbols):
+        context = Context('<MAIN>', symbol_table=symbols)
+        if self.engine == 'python':
+            program, error = self.code_cache.load(filename, text, self.optimize, self.lexer, self.parser)
+            if error: return error
+            res = program.run(context, filename, text)
+        else:
+            node, error = self.parse_cache.parse(filename, text, self.optimize, self.lexer, self.parser)
+            if error: return error
+
+            prepared = None
+            if self.engine in PREPARE:
+                prepared = self.parse_cache.attached(node, self.engine, PREPARE[self.engine], filename, text, self.optimize)
+            res = runTree(self.engine, node, context, prepared)
+
+        if res.error: return res.error
+        return res.value
+
+    def interpretMany(self, texts, workers=None, filename: str = '<engine>') -> list:
+        """
+        Interprets `texts` on a pool of `workers` threads, returning what
+        interpret gives for each, in order. Programs that assign still run
+        one at a time, in whichever order the threads reach them.
+        """
+
+        with ThreadPoolExecutor(workers) as executor:
+            return list(executor.map(lambda text: self.interpret(text, filename), texts))
+
+    def get(self, name):
+        value = self.symbols.get(name)
+        return None if value is None else value.value
+
+    def set(self, name, value):
+        with self.write_lock:
+            symbols = self.symbols.copy()
+            symbols.set(name, None if value is None else Number(value))
+            self.symbols = symbols
+
+    def reset(self):
+        with self.write_lock:
+            self.symbols = SymbolTable()
@@ -20,9 +20,16 @@ class ErrorBase:
     def point_error(self):
         err = ''
         text = self.pos_start.text
-
-        idx_start = max(text.rfind('\n', 0, self.pos_start.index), 0)
-        idx_end = text.find('\n', idx_start + 1)
+        lines = self.pos_start.lines
+        if lines is not None:
+            lastNewlineBefore, nextNewlineFrom = lines.lastNewlineBefore, lines.nextNewlineFrom
+        else:
+            # Without an index, scanning only the lines pointed at is cheaper than building one
+            lastNewlineBefore = lambda index: text.rfind('\n', 0, index)
+            nextNewlineFrom = lambda index: text.find('\n', index)
+
+        idx_start = max(lastNewlineBefore(self.pos_start.index), 0)
+        idx_end = nextNewlineFrom(idx_start + 1)
         if idx_end < 0: idx_end = len(text)
 
         num_lines = self.pos_end.line_no - self.pos_start.line_no + 1
@@ -35,7 +42,7 @@ class ErrorBase:
             err += ' ' * col_start + '^' * (col_end - col_start)
 
             idx_start = idx_end
-            idx_end = text.find('\n', idx_start + 1)
+            idx_end = nextNewlineFrom(idx_start + 1)
             if idx_end < 0: idx_end = len(text)
 
         return err.replace('\t', '')
@@ -84,9 +91,40 @@ class RunTimeError(ErrorBase):
         return 'Traceback:\n' + err
 
 
+# ===========================
+# Budget Exceeded
+# ===========================
+class BudgetError(RunTimeError):
+    def __init__(self, context, details, pos_start, pos_end):
+        super().__init__(context, details, pos_start, pos_end)
+        self.name = 'Budget Exceeded'
+
+
 # ===========================
 # Expected Character
 # ===========================
 class ExpectedCharError(ErrorBase):
     def __init__(self, details, pos_start: Position, pos_end: Position):
         super().__init__('Expected Character', details, pos_start, pos_end)
+
+
+# ===========================
+# Failure signals
+# ===========================
+class Failure(Exception):
+    """
+    Carries an error up the stack on the internal fast paths, where a
+    failed ParseResult or RuntimeResult would otherwise be returned.
+    """
+
+    def __init__(self, error: ErrorBase):
+        super().__init__(error.details)
+        self.error = error
+
+
+class ParseFailure(Failure):
+    pass
+
+
+class RuntimeFailure(Failure):
+    pass
@@ -0,0 +1,158 @@
+from language.nodes import *
+from language.resolver import childrenOf
+from language.unboxed import UnboxedInterpreter
+
+# Reading these again costs no more than remembering them
+LEAVES = (NumberNode, VarAccessNode)
+
+
+# ===========================
+# SHAPES
+# ===========================
+class Shapes:
+    """
+    Structurally identical subtrees of one tree, positions aside. Every node
+    of a subtree that occurs more than once and assigns nothing maps, in
+    `shared`, to the number of its shape; `reads` holds the variables each
+    shape reads, or None when it assigns one.
+    """
+
+    __slots__ = ('shared', 'reads')
+
+    def __init__(self, shared, reads):
+        self.shared = shared
+        self.reads = reads
+
+
+def keyOf(node, shapes):
+    # Children are numbered first, so they compare by shape
+    kind = node.__class__
+    if kind is NumberNode:
+        # repr tells 1 from 1.0 and 0.0 from -0.0, which compare equal
+        return kind, repr(node.token.value)
+    if kind is VarAccessNode:
+        return kind, node.var_name.value
+    if kind is BinaryOpNode:
+        operator = node.operator
+        return kind, operator.token_type, operator.value, shapes[node.left], shapes[node.right]
+    if kind is UnaryOpNode:
+        return kind, node.operator.token_type, shapes[node.node]
+    if kind is VarAssignNode:
+        return kind, node.var_name.value, shapes[node.value]
+
+    cases = tuple((shapes[cond], shapes[expr]) for cond, expr in node.cases)
+    return kind, cases, node.else_case and shapes[node.else_case]
+
+
+def readsOf(node, shapes, reads):
+    kind = node.__class__
+    if kind is NumberNode: return frozenset()
+    if kind is VarAccessNode: return frozenset((node.var_name.value,))
+    if kind is VarAssignNode: return None
+
+    found = [reads[shapes[child]] for child in childrenOf(node)]
+    if None in found: return None
+    return frozenset().union(*found)
+
+
+def shapesOf(root) -> Shapes:
+    """
+    Numbers the shapes of every subtree of `root`, hash-consing them, without
+    changing the tree: each occurrence keeps its own node and positions. The
+    tree is not turned into a DAG, so this saves repeated evaluation, never
+    memory; the Shapes are held besides the tree.
+    """
+
+    numbers = {}
+    shapes = {}
+    reads = []
+    counts = []
+
+    # Post-order with an explicit stack, so any depth is numbered
+    stack = [(root, False)]
+    while stack:
+        node, ready = stack.pop()
+        if not ready:
+            stack.append((node, True))
+            stack.extend((child, False) for child in childrenOf(node))
+            continue
+
+        key = keyOf(node, shapes)
+        shape = numbers.get(key)
+        if shape is None:
+            shape = numbers[key] = len(reads)
+            reads.append(readsOf(node, shapes, reads))
+            counts.append(0)
+        counts[shape] += 1
+        shapes[node] = shape
+
+    shared = {
+        node: shape for node, shape in shapes.items()
+        if counts[shape] > 1 and reads[shape] is not None and node.__class__ not in LEAVES
+    }
+    return Shapes(shared, reads)
+
+
+# ===========================
+# MEMOIZING INTERPRETER
+# ===========================
+class MemoInterpreter(UnboxedInterpreter):
+    """
+    Unboxed tree walker that evaluates every subexpression repeated within a
+    tree, and assigning nothing, only once per evaluation; later occurrences
+    take the value of the first. When an assignment changes a variable, the
+    remembered values of subexpressions reading it are dropped.
+
+    Occurrences are distinct nodes, so values and errors keep the positions
+    of the occurrence they come from. Pass the tree's Shapes to visit when
+    they were kept from an earlier call.
+    """
+
+    def __init__(self, context):
+        super().__init__(context)
+        self.shapes = None
+        self.memo = {}
+
+    def visit(self, node, shapes: Shapes = None):
+        self.shapes = shapesOf(node) if shapes is None else shapes
+        self.memo = {}
+        return super().visit(node)
+
+    def evaluate(self, node):
+        shape = self.shapes.shared.get(node)
+        if shape is None:
+            return self.methods[node.__class__](node)
+
+        found = self.memo.get(shape)
+        if found is not None:
+            value, branches = found
+            self.retake(node, branches)
+            return value
+
+        value = self.methods[node.__class__](node)
+        self.memo[shape] = value, self.branchesOf(node)
+        return value
+
+    def branchesOf(self, node):
+        # The case every condition on the way to the value's origin took
+        branches = []
+        while node.__class__ is ConditionsNode:
+            taken = self.taken[node]
+            branches.append(next((i for i, (_, expr) in enumerate(node.cases) if expr is taken), -1))
+            node = taken
+        return branches
+
+    def retake(self, node, branches):
+        # Takes the same cases in this occurrence, so its value has an origin of its own
+        for index in branches:
+            taken = node.else_case if index < 0 else node.cases[index][1]
+            self.taken[node] = taken
+            node = taken
+
+    def store(self, node, value):
+        super().store(node, value)
+
+        var = node.var_name.value
+        reads = self.shapes.reads
+        for shape in [shape for shape in self.memo if var in reads[shape]]:
+            del self.memo[shape]
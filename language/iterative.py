@@ -0,0 +1,113 @@
+from itertools import repeat
+
+from language.nodes import *
+from language.tokens import TokenType
+from language.unboxed import UnboxedInterpreter
+from language.adaptive import EvaluationFailure, OPERATIONS
+
+# Turns for running until the stack is empty. Stateless, so shared.
+FOREVER = repeat(None)
+
+
+# ===========================
+# ITERATIVE INTERPRETER
+# ===========================
+class IterativeInterpreter(UnboxedInterpreter):
+    """
+    Unboxed tree walker that keeps the nodes it still has to finish on an
+    explicit stack rather than the Python call stack, so trees of any depth
+    evaluate, with memory linear in their depth.
+
+    Each entry is a node and the number of its children already evaluated;
+    their values wait on a separate value stack.
+    """
+
+    def evaluate(self, root):
+        stack = [(root, 0)]
+        values = []
+        self.run(stack, values)
+        return values.pop()
+
+    def run(self, stack, values, turns=FOREVER):
+        """
+        Evaluates nodes off `stack`, one per item of `turns`, and returns the
+        last one. Once the stack is empty, the value is left on `values`.
+        """
+
+        symbols = self.context.symbol_table
+
+        # Looping over `turns` costs less than counting nodes
+        for _ in turns:
+            if not stack: break
+            node, done = stack.pop()
+            kind = node.__class__
+
+            if kind is NumberNode:
+                values.append(node.token.value)
+
+            elif kind is VarAccessNode:
+                try:
+                    value = symbols.values[node.slot]
+                except KeyError:
+                    value = None
+
+                if value is None:
+                    value = symbols.get(node.var_name.value)
+                if value is None:
+                    raise EvaluationFailure(node, f'{node.var_name.value} is not defined!')
+                values.append(value.value)
+
+            elif kind is BinaryOpNode:
+                if not done:
+                    # Left is popped, and so evaluated, first
+                    stack.append((node, 1))
+                    stack.append((node.right, 0))
+                    stack.append((node.left, 0))
+                    continue
+
+                right = values.pop()
+                left = values.pop()
+                operator = node.operator
+                operation = OPERATIONS.get(operator.token_type) or OPERATIONS[operator.value]
+
+                try:
+                    values.append(operation(left, right))
+                except ZeroDivisionError:
+                    if operator.token_type != TokenType.DIVIDE: raise
+                    raise EvaluationFailure(self.origin(node.right), 'Division by zero not defined')
+
+            elif kind is UnaryOpNode:
+                if not done:
+                    stack.append((node, 1))
+                    stack.append((node.node, 0))
+                elif node.operator.token_type == TokenType.MINUS:
+                    values.append(values.pop() * -1)
+
+            elif kind is VarAssignNode:
+                if not done:
+                    stack.append((node, 1))
+                    stack.append((node.value, 0))
+                else:
+                    value = values[-1]
+                    self.store(node, None if value is None else self.box(value, node))
+
+            else:
+                # `done` counts the conditions tested so far
+                if done:
+                    if values.pop() != 0:
+                        expr = node.cases[done - 1][1]
+                        self.taken[node] = expr
+                        stack.append((expr, 0))
+                        continue
+
+                if done < len(node.cases):
+                    stack.append((node, done + 1))
+                    stack.append((node.cases[done][0], 0))
+                else:
+                    self.taken[node] = node.else_case
+                    if node.else_case:
+                        stack.append((node.else_case, 0))
+                    else:
+                        values.append(None)
+
+        return node
@@ -5,6 +5,8 @@ from language.tokens import Token
 # EXPRESSION TREE NODES
 # ===========================
 class NumberNode:
+    __slots__ = ('token', 'pos_start', 'pos_end')
+
     def __init__(self, token: Token):
         self.token = token
         self.pos_start = token.pos_start
@@ -12,6 +14,8 @@ class NumberNode:
 
 
 class BinaryOpNode:
+    __slots__ = ('left', 'operator', 'right', 'pos_start', 'pos_end')
+
     def __init__(self, left, operator: Token, right):
         self.left = left
         self.operator = operator
@@ -21,6 +25,8 @@ class BinaryOpNode:
 
 
 class UnaryOpNode:
+    __slots__ = ('operator', 'node', 'pos_start', 'pos_end')
+
     def __init__(self, operator: Token, node):
         self.operator = operator
         self.node = node
@@ -29,21 +35,29 @@ class UnaryOpNode:
 
 
 class VarAccessNode:
+    __slots__ = ('var_name', 'slot', 'pos_start', 'pos_end')
+
     def __init__(self, var_name):
         self.var_name = var_name
+        self.slot = None
         self.pos_start = var_name.pos_start
         self.pos_end = var_name.pos_end
 
 
 class VarAssignNode:
+    __slots__ = ('var_name', 'value', 'slot', 'pos_start', 'pos_end')
+
     def __init__(self, var_name, value):
         self.var_name = var_name
+        self.slot = None
         self.value = value
         self.pos_start = var_name.pos_start
         self.pos_end = value.pos_end
 
 
 class ConditionsNode:
+    __slots__ = ('cases', 'else_case', 'pos_start', 'pos_end')
+
     def __init__(self, cases, else_case=None):
         self.cases = cases
         self.else_case = else_case
@@ -0,0 +1,241 @@
+import math
+
+from language.nodes import *
+from language.utils import Context
+from language.errors import RuntimeFailure
+from language.tokens import Token, TokenType, SymbolTable
+from language.parsing import Interpreter
+from language.resolver import childrenOf
+
+# Powers whose result would need more bits than this are left to runtime
+FOLD_LIMIT_BITS = 4096
+
+
+def countNodes(node):
+    count = 0
+    stack = [node]
+    while stack:
+        count += 1
+        stack.extend(childrenOf(stack.pop()))
+    return count
+
+
+def withPositions(node, original):
+    # Parents span their children, so a rewritten node keeps the span it was parsed
+    # with; otherwise errors reported at an enclosing node would move.
+    node.pos_start = original.pos_start
+    node.pos_end = original.pos_end
+    return node
+
+
+def isConstant(node, value=None):
+    if not isinstance(node, NumberNode): return False
+    return value is None or (type(node.token.value) is type(value) and node.token.value == value)
+
+
+def isInteger(node):
+    # Whether the node can only ever evaluate to an int
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, NumberNode):
+            if type(node.token.value) is not int: return False
+        elif isinstance(node, BinaryOpNode):
+            token_type = node.operator.token_type
+            if token_type in (TokenType.PLUS, TokenType.MINUS, TokenType.MULTIPLY):
+                stack.extend((node.left, node.right))
+            elif token_type in (TokenType.DIVIDE, TokenType.POWER):
+                return False
+        elif isinstance(node, UnaryOpNode):
+            stack.append(node.node)
+        else:
+            return False
+    return True
+
+
+def childrenWithExactness(node, exact):
+    # Children in evaluation order, each with whether the positions of its value
+    # are reported by a division by zero
+    kind = node.__class__
+    if kind is BinaryOpNode:
+        return [(node.left, False), (node.right, node.operator.token_type == TokenType.DIVIDE)]
+    if kind is UnaryOpNode:
+        return [(node.node, False)]
+    if kind is VarAssignNode:
+        return [(node.value, exact)]
+    if kind is ConditionsNode:
+        children = [pair for cond, expr in node.cases for pair in ((cond, False), (expr, exact))]
+        if node.else_case: children.append((node.else_case, exact))
+        return children
+    return []
+
+
+def rebuilt(node, children):
+    # `node` over new children, given in the order childrenWithExactness lists them
+    if isinstance(node, BinaryOpNode):
+        return withPositions(BinaryOpNode(children[0], node.operator, children[1]), node)
+    if isinstance(node, UnaryOpNode):
+        return withPositions(UnaryOpNode(node.operator, children[0]), node)
+    if isinstance(node, VarAssignNode):
+        return withPositions(VarAssignNode(node.var_name, children[0]), node)
+
+    cases = list(zip(children[0:2 * len(node.cases):2], children[1:2 * len(node.cases):2]))
+    else_case = children[-1] if node.else_case else None
+    return withPositions(ConditionsNode(cases, else_case), node)
+
+
+# ===========================
+# OPTIMIZER
+# ===========================
+class Optimizer:
+    """
+    Rewrites a parsed tree into a cheaper, equivalent one.
+
+    Passes never mutate the tree they are given; unchanged subtrees are
+    shared with it. Anything that would raise at runtime is left in place, so
+    the error is still reported, with the same positions, when it runs.
+    Trees are walked with an explicit stack, so any depth is optimized.
+    """
+
+    PASSES = ('fold', 'prune', 'simplify')
+
+    def __init__(self, passes=PASSES, max_rounds=4):
+        for name in passes:
+            if name not in self.PASSES:
+                raise ValueError(f'Unknown pass {name!r}, expected one of {self.PASSES}')
+
+        self.passes = passes
+        self.max_rounds = max_rounds
+        self.stats = {name: 0 for name in passes}
+        self.folder = Interpreter(Context('<FOLD>', symbol_table=SymbolTable()))
+
+    def optimize(self, node):
+        for _ in range(self.max_rounds):
+            changed = False
+
+            for name in self.passes:
+                result, before = self.transform(node, getattr(self, name))
+                if result is not node:
+                    self.stats[name] += before - countNodes(result)
+                    changed = True
+                node = result
+
+            if not changed: break
+        return node
+
+    @staticmethod
+    def transform(root, rewrite):
+        """
+        Rewrites every node after its children, bottom up, with `rewrite(node,
+        exact)`, where `exact` marks nodes whose value positions are reported
+        by a division by zero. Returns the new tree and the size of the old.
+        """
+
+        results = []
+        stack = [(root, False, None)]
+        count = 0
+
+        while stack:
+            node, exact, children = stack.pop()
+            if children is None:
+                count += 1
+                children = childrenWithExactness(node, exact)
+                if children:
+                    stack.append((node, exact, children))
+                    stack.extend([(child, child_exact, None) for child, child_exact in reversed(children)])
+                    continue
+            else:
+                new = results[-len(children):]
+                del results[-len(children):]
+                for child, (old, _) in zip(new, children):
+                    if child is not old:
+                        node = rebuilt(node, new)
+                        break
+
+            results.append(rewrite(node, exact))
+
+        return results[0], count
+
+    # ===========================
+    # CONSTANT FOLDING
+    # ===========================
+    def fold(self, node, exact):
+        if isinstance(node, BinaryOpNode) and isConstant(node.left) and isConstant(node.right):
+            if node.operator.token_type == TokenType.POWER and not self.isSmallPower(
+                    node.left.token.value, node.right.token.value
+            ): return node
+            return self.evaluate(node)
+
+        if isinstance(node, UnaryOpNode) and isConstant(node.node):
+            return self.evaluate(node)
+
+        return node
+
+    def isSmallPower(self, base, exponent):
+        if not isinstance(exponent, int) or exponent <= 0 or abs(base) <= 1:
+            return True
+        # Exponents too large for a float are far past the limit anyway
+        if exponent.bit_length() > 64: return False
+        return exponent * math.log2(abs(base)) <= FOLD_LIMIT_BITS
+
+    def evaluate(self, node):
+        try:
+            value = self.folder.compute(node).value
+        except (RuntimeFailure, ArithmeticError, TypeError, ValueError):
+            return node
+
+        if type(value) not in (int, float): return node
+        token_type = TokenType.INT if type(value) is int else TokenType.FLOAT
+        return NumberNode(Token(token_type, value, node.pos_start, node.pos_end))
+
+    # ===========================
+    # DEAD BRANCH ELIMINATION
+    # ===========================
+    def prune(self, node, exact):
+        if not isinstance(node, ConditionsNode): return node
+
+        cases = []
+        for cond, expr in node.cases:
+            if not isConstant(cond):
+                cases.append((cond, expr))
+            elif cond.token.value != 0:
+                if not cases: return expr
+                return withPositions(ConditionsNode(cases, expr), node)
+
+        if not cases:
+            if node.else_case: return node.else_case
+            # Nothing matches, but the node must still evaluate to nothing
+            cases = node.cases[-1:]
+
+        if len(cases) == len(node.cases): return node
+        return withPositions(ConditionsNode(cases, node.else_case), node)
+
+    # ===========================
+    # ALGEBRAIC SIMPLIFICATION
+    # ===========================
+    def simplify(self, node, exact):
+        # Dropping a node would move the position a division by zero reports
+        if exact: return node
+
+        if isinstance(node, UnaryOpNode) and node.operator.token_type == TokenType.PLUS:
+            return node.node
+
+        if not isinstance(node, BinaryOpNode): return node
+        token_type, left, right = node.operator.token_type, node.left, node.right
+
+        if token_type == TokenType.MULTIPLY:
+            if isConstant(right, 1): return left
+            if isConstant(left, 1): return right
+
+        elif token_type == TokenType.POWER:
+            if isConstant(right, 1): return left
+
+        elif token_type == TokenType.MINUS:
+            if isConstant(right, 0): return left
+
+        elif token_type == TokenType.PLUS:
+            # -0.0 + 0 is 0.0, so this only holds for operands that are always ints
+            if isConstant(right, 0) and isInteger(left): return left
+            if isConstant(left, 0) and isInteger(right): return right
+
+        return node
@@ -0,0 +1,113 @@
+import os
+from math import ceil
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+
+from language.utils import Context, Position
+from language.tokens import SymbolTable
+from language.datatypes import Number
+from language.errors import RunTimeError
+from language.bytecode import Bytecode, Compiler, VM
+from language.cache import parseSource
+from language.core import PARSE_CACHE
+
+# Chunks handed to each worker when no chunk size is given
+CHUNKS_PER_WORKER = 4
+
+
+def compileProgram(filename, text, optimize=False, use_cache=True, lexer='regex', parser='recursive'):
+    if use_cache:
+        node, error = PARSE_CACHE.parse(filename, text, optimize, lexer, parser)
+    else:
+        node, error = parseSource(filename, text, optimize, lexer, parser)
+    if error: return None, error
+
+    return Compiler().compile(node), None
+
+
+# ===========================
+# WORKER
+# ===========================
+def detach(context):
+    # Tracebacks only need the chain of names and entries, not the symbol tables
+    if context is None: return None
+    return Context(context.context_name, detach(context.parent), context.parent_entry)
+
+
+def runProgram(program, options):
+    if isinstance(program, Bytecode):
+        code = program
+    else:
+        code, error = compileProgram(*program, *options)
+        if error: return error
+
+    # Every program gets a global scope of its own
+    context = Context('<MAIN>', symbol_table=SymbolTable())
+    res = VM(context).run(code)
+
+    if res.error:
+        error = res.error
+        if isinstance(error, RunTimeError): error.context = detach(error.context)
+        return error
+    return None if res.value is None else Number(res.value.value)
+
+
+def failureOf(program, exception):
+    # A RunTimeError spanning the whole program, for exceptions the VM lets through
+    if isinstance(program, Bytecode):
+        pos_start, pos_end = program.pos_start, program.pos_end
+    else:
+        filename, text = program
+        pos_start, pos_end = Position(filename, text, 0, 0, 0), Position(filename, text, len(text), 0, len(text))
+    return RunTimeError(Context('<MAIN>'), f'{type(exception).__name__}: {exception}', pos_start, pos_end)
+
+
+def runChunk(programs, options):
+    results = []
+    for program in programs:
+        try:
+            results.append(runProgram(program, options))
+        except Exception as exception:
+            # Only this program's result is lost, not the chunk's, nor the whole call
+            results.append(failureOf(program, exception))
+    return results
+
+
+# ===========================
+# PROCESS POOL
+# ===========================
+def interpretMany(programs, workers=None, chunksize=None, optimize=False, use_cache=True,
+                  lexer='regex', parser='recursive', executor=None):
+    """
+    Runs independent programs across a pool of processes, giving back what
+    interpret would for each one, in input order.
+
+    `programs` holds source texts, (filename, text) pairs, or Bytecode from
+    compileProgram. Sources are parsed by the workers; compiled programs go
+    to them as bytecode, pickled as offsets into their source, and are not
+    parsed again. Each runs on the VM in a fresh global scope, so none sees
+    GLOBALS or another program's variables.
+
+    Programs that raise, such as ones too deeply nested to parse, give a
+    RunTimeError naming the exception in their place.
+
+    Pass an `executor` to reuse a pool across calls; otherwise one is started
+    with `workers` processes. Chunks default to a few per worker.
+    """
+
+    programs = [('<program>', program) if isinstance(program, str) else program for program in programs]
+    if not programs: return []
+
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, ceil(len(programs) / (workers * CHUNKS_PER_WORKER)))
+
+    chunks = [programs[start: start + chunksize] for start in range(0, len(programs), chunksize)]
+    options = (optimize, use_cache, lexer, parser)
+
+    own = executor is None
+    if own: executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        return [result for chunk in executor.map(runChunk, chunks, repeat(options)) for result in chunk]
+    finally:
+        if own: executor.shutdown()
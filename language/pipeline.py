@@ -0,0 +1,191 @@
+"""
+Streams a CSV file through one or more formulas, writing every input row
+with a column per formula added.
+
+    python -m language.pipeline data.csv -f total "price * quantity" -f taxed "total * 1.2" -o out.csv
+
+Each formula sees the row's columns as variables, and the results of the
+formulas before it. Bad rows are reported on stderr and written with empty
+results; the job carries on.
+"""
+import csv
+import sys
+import time
+import argparse
+
+from language.utils import Context, Position, readLines, CHUNK_SIZE
+from language.tokens import SymbolTable, slotOf
+from language.datatypes import Number
+from language.errors import InvalidSyntaxError, RunTimeError, ParseFailure, Failure
+from language.results import RuntimeResult
+from language.cache import parseSource
+from language.resolver import variablesOf
+from language.unboxed import UnboxedInterpreter
+
+CHUNK_ROWS = 4096
+
+
+# ===========================
+# CELLS
+# ===========================
+def toNumber(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+# ===========================
+# STATS
+# ===========================
+class PipelineStats:
+    def __init__(self):
+        self.rows = 0
+        self.bad_rows = 0
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return f'{self.rows} rows ({self.bad_rows} bad) in {self.seconds:.2f}s, {self.rows_per_second:,.0f} rows/s'
+
+
+# ===========================
+# PIPELINE
+# ===========================
+class Pipeline:
+    """
+    Evaluates formulas over the rows of a CSV stream, a chunk of rows at a
+    time, so memory stays flat however large the input is.
+
+    `formulas` maps each output column to its formula, in evaluation order.
+    Formulas are parsed and resolved once; a syntax error raises ParseFailure.
+    Only the columns the formulas read are converted to numbers, the rest
+    pass through untouched. Empty cells leave their variable undefined, and
+    every row starts with no variables but its own columns.
+    """
+
+    def __init__(self, formulas, chunk_size=CHUNK_SIZE, chunk_rows=CHUNK_ROWS, optimize=True):
+        self.formulas = []
+        for name, text in dict(formulas).items():
+            node, error = parseSource(f'<{name}>', text, optimize)
+            if error: raise ParseFailure(error)
+            self.formulas.append((name, slotOf(name), node))
+
+        self.variables = set().union(*(variablesOf(node) for _, _, node in self.formulas))
+
+        self.chunk_size = chunk_size
+        self.chunk_rows = chunk_rows
+
+    def run(self, source, output, errors=None) -> PipelineStats:
+        stats = PipelineStats()
+        start = time.perf_counter()
+
+        reader = csv.reader(readLines(source, self.chunk_size))
+        writer = csv.writer(output)
+
+        header = next(reader, None)
+        if header is None: return stats
+
+        columns = [(index, column, slotOf(column)) for index, column in enumerate(header) if column in self.variables]
+        writer.writerow(header + [name for name, _, _ in self.formulas])
+
+        interpreter = UnboxedInterpreter(Context('<ROW>'))
+
+        chunk = []
+        for row in reader:
+            chunk.append(self.evaluate(row, reader.line_num, columns, interpreter, stats, errors))
+            if len(chunk) >= self.chunk_rows:
+                writer.writerows(chunk)
+                chunk.clear()
+
+        writer.writerows(chunk)
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+    def evaluate(self, row, line, columns, interpreter, stats, errors):
+        context = interpreter.context
+        context.context_name = f'<ROW {line}>'
+        # A table per row, so nothing a formula assigns carries over to the next
+        symbols = context.symbol_table = SymbolTable()
+        problems = []
+
+        for index, column, slot in columns:
+            text = row[index] if index < len(row) else ''
+            if not text: continue
+
+            try:
+                value = toNumber(text)
+            except ValueError:
+                problems.append((column, InvalidSyntaxError(
+                    'Expected a number',
+                    Position(f'<{column}>', text, 0, 0, 0),
+                    Position(f'<{column}>', text, len(text), 0, len(text))
+                )))
+                continue
+
+            symbols.store(slot, Number(value))
+
+        results = []
+        for name, slot, node in self.formulas:
+            try:
+                res = interpreter.visit(node)
+            except (ArithmeticError, TypeError) as exception:
+                # Such as a float overflowing on this row's data, reported like any bad cell
+                res = RuntimeResult().failure(RunTimeError(
+                    context, f'{type(exception).__name__}: {exception}', node.pos_start, node.pos_end
+                ))
+
+            if res.error:
+                problems.append((name, res.error))
+                symbols.store(slot, None)
+                results.append('')
+                continue
+
+            symbols.store(slot, res.value)
+            results.append('' if res.value is None else res.value.value)
+
+        stats.rows += 1
+        if problems:
+            stats.bad_rows += 1
+            if errors is not None:
+                for column, error in problems:
+                    errors.write(f'Row {line}, column {column}:\n{error!r}\n\n')
+
+        return row + results
+
+
+# ===========================
+# COMMAND LINE
+# ===========================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('input', help='CSV file with a header row, or - for stdin')
+    parser.add_argument('-f', '--formula', nargs=2, action='append', required=True, metavar=('NAME', 'FORMULA'))
+    parser.add_argument('-o', '--output', default='-', help='CSV file to write, or - for stdout')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='bytes read at a time')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help='rows written at a time')
+    args = parser.parse_args(argv)
+
+    try:
+        pipeline = Pipeline(args.formula, args.chunk_size, args.chunk_rows)
+    except Failure as failure:
+        print(repr(failure.error), file=sys.stderr)
+        return 1
+
+    source = sys.stdin.buffer if args.input == '-' else open(args.input, 'rb')
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+    try:
+        stats = pipeline.run(source, output, sys.stderr)
+    finally:
+        if source is not sys.stdin.buffer: source.close()
+        if output is not sys.stdout: output.close()
+
+    print(stats, file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
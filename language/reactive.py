@@ -0,0 +1,180 @@
+import threading
+
+from language.nodes import *
+from language.errors import RunTimeError
+from language.results import RuntimeResult
+from language.resolver import walk, variablesOf
+from language.unboxed import UnboxedInterpreter
+
+
+# ===========================
+# PROFILE
+# ===========================
+class ReactiveProfile:
+    def __init__(self):
+        self.recomputed = 0
+        self.skipped = 0
+        self.cycles = 0
+
+    def asDict(self):
+        return {
+            'recomputed': self.recomputed,
+            'skipped': self.skipped,
+            'cycles': self.cycles,
+        }
+
+
+# ===========================
+# REACTIVE INTERPRETER
+# ===========================
+class ReactiveInterpreter(UnboxedInterpreter):
+    """
+    Treats every top-level `soch name ... hai` as a formula, like a
+    spreadsheet cell: the variables it reads are recorded, and whenever one
+    of them is assigned again the formula is recomputed, and so on down the
+    dependency graph, in topological order. A formula whose value comes out
+    unchanged does not recompute the ones that read it.
+
+    A formula that would depend on itself is rejected with a RunTimeError.
+    Formulas that fail, for instance on a variable not defined yet, leave
+    their variable undefined, keep their error in `errors`, and are
+    recomputed once their inputs change. Any other assignment, such as one
+    nested in an expression, replaces the formula of its variable with the
+    plain value.
+
+    Only changes made through visit propagate; setting the symbol table
+    directly does not. The dependency graph is shared by every caller, so
+    visits on one interpreter take turns.
+    """
+
+    def __init__(self, context):
+        super().__init__(context)
+        self.formulas = {}
+        self.reads = {}
+        self.readers = {}
+        self.errors = {}
+        self.profile = ReactiveProfile()
+        self.lock = threading.Lock()
+
+    def visit(self, node):
+        with self.lock:
+            if isinstance(node, VarAssignNode):
+                return self.define(node)
+
+            res = super().visit(node)
+            self.propagate(self.overwrite(node))
+            return res
+
+    def define(self, node: VarAssignNode):
+        name = node.var_name.value
+        reads = variablesOf(node.value)
+
+        cycle = self.cycle(name, reads)
+        if cycle:
+            self.profile.cycles += 1
+            return RuntimeResult().failure(RunTimeError(
+                self.context, f'Circular dependency {" -> ".join(cycle)}',
+                node.var_name.pos_start, node.var_name.pos_end
+            ))
+
+        self.unlink(name)
+        self.formulas[name] = node
+        self.reads[name] = reads
+        for read in reads:
+            self.readers.setdefault(read, set()).add(name)
+
+        res = self.recompute(name)
+        self.propagate({name} | self.overwrite(node.value))
+        return res
+
+    def overwrite(self, node):
+        # Variables a statement assigns outside of a formula lose their formula
+        names = {found.var_name.value for found in walk(node) if isinstance(found, VarAssignNode)}
+        for name in names:
+            self.unlink(name)
+        return names
+
+    def unlink(self, name):
+        if self.formulas.pop(name, None) is None: return
+
+        for read in self.reads.pop(name):
+            self.readers[read].discard(name)
+        self.errors.pop(name, None)
+
+    def cycle(self, name, reads):
+        # The chain of reads that would lead from `name` back to itself,
+        # found by walking the formulas that read it, directly or not
+        parents = {name: None}
+        queue = [name]
+        for current in queue:
+            if current in reads:
+                chain = []
+                while current is not None:
+                    chain.append(current)
+                    current = parents[current]
+                return [name] + chain
+
+            for reader in self.readers.get(current, ()):
+                if reader not in parents:
+                    parents[reader] = current
+                    queue.append(reader)
+
+        return None
+
+    def recompute(self, name):
+        node = self.formulas[name]
+        res = super().visit(node)
+
+        if res.error:
+            self.store(node, None)
+            self.errors[name] = res.error
+        else:
+            self.errors.pop(name, None)
+        return res
+
+    def current(self, name):
+        value = self.context.symbol_table.get(name)
+        return None if value is None else (type(value.value), value.value)
+
+    def downstream(self, changed):
+        # Formulas reading any of `changed`, directly or not, in topological order
+        reached = set()
+        stack = list(changed)
+        while stack:
+            for reader in self.readers.get(stack.pop(), ()):
+                if reader not in reached:
+                    reached.add(reader)
+                    stack.append(reader)
+
+        waiting = {name: len(self.reads[name] & reached) for name in reached}
+        ready = [name for name, count in waiting.items() if count == 0]
+        order = []
+        while ready:
+            name = ready.pop()
+            order.append(name)
+            for reader in self.readers.get(name, ()):
+                if reader in waiting:
+                    waiting[reader] -= 1
+                    if waiting[reader] == 0: ready.append(reader)
+
+        return order
+
+    def propagate(self, changed):
+        if not changed: return
+
+        changed = set(changed)
+        triggers = len(changed.intersection(self.formulas))
+        recomputed = 0
+
+        for name in self.downstream(changed):
+            if self.reads[name].isdisjoint(changed): continue
+
+            before = self.current(name)
+            self.recompute(name)
+            recomputed += 1
+
+            if self.current(name) != before:
+                changed.add(name)
+
+        self.profile.recomputed += recomputed
+        self.profile.skipped += len(self.formulas) - triggers - recomputed
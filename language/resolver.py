@@ -0,0 +1,46 @@
+from language.nodes import *
+from language.tokens import slotOf
+
+
+# ===========================
+# RESOLVER
+# ===========================
+def childrenOf(node):
+    kind = node.__class__
+    if kind is BinaryOpNode: return [node.left, node.right]
+    if kind is UnaryOpNode: return [node.node]
+    if kind is VarAssignNode: return [node.value]
+    if kind is ConditionsNode:
+        children = [child for case in node.cases for child in case]
+        if node.else_case: children.append(node.else_case)
+        return children
+    return []
+
+
+def walk(root):
+    # Every node of the tree, in evaluation order, with an explicit stack so
+    # any depth is walked
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(childrenOf(node)))
+
+
+def resolve(root):
+    """
+    Gives every VarAccessNode and VarAssignNode in the tree the slot of its
+    variable, so evaluating it indexes SymbolTable.values instead of looking
+    names up.
+    """
+
+    for node in walk(root):
+        if isinstance(node, (VarAccessNode, VarAssignNode)):
+            node.slot = slotOf(node.var_name.value)
+
+    return root
+
+
+def variablesOf(root):
+    # Names the tree reads
+    return {node.var_name.value for node in walk(root) if isinstance(node, VarAccessNode)}
@@ -45,3 +45,19 @@ class RuntimeResult(ResultBase):
     def register(self, res):
         if res.error: self.error = res.error
         return res.value
+
+
+# ===========================
+# BATCH RESULT
+# ===========================
+class BatchResult(ResultBase):
+    def __init__(self):
+        super().__init__()
+        self.failed = None
+        self.missing = None
+
+    def success(self, value, failed=None, missing=None):
+        self.value = value
+        self.failed = failed
+        self.missing = missing
+        return self
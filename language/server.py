@@ -0,0 +1,236 @@
+"""
+Serves FunLang over a TCP or Unix socket, one session per connection.
+
+    python -m language.server --port 7878
+    python -m language.server --unix /tmp/funlang.sock
+
+The protocol is line based. Each line a client sends is a program, and the
+server answers every line with one line of JSON, in order, so requests can
+be pipelined:
+
+    {"value": 7}
+    {"error": "Runtime Error", "details": "x is not defined!", "start": 0, "end": 1}
+
+`start` and `end` are character offsets into the request line. Lines
+starting with `:` are commands: `:stats` for the session's latency
+percentiles, `:reset` to forget its variables and `:quit`.
+
+Every session has a symbol table of its own; the parse cache is shared.
+Sessions idle for longer than `idle_timeout` are closed. Programs whose
+ints could grow past `--max-bits` are rejected before they run, and a
+request that fails in any other way is answered with an Internal Error.
+"""
+import sys
+import json
+import time
+import asyncio
+import argparse
+import itertools
+from collections import deque
+
+from language.tokens import SymbolTable
+from language.errors import ErrorBase
+from language.budget import Budget
+from language.core import interpretAsync, PARSE_CACHE
+
+DEFAULT_PORT = 7878
+
+# Longest request line accepted, in bytes
+MAX_LINE = 64 * 1024
+
+# Latencies kept per session for its percentiles
+LATENCY_SAMPLES = 4096
+
+# Largest int a program may produce by default, in bits. Ints print with at
+# most sys.get_int_max_str_digits() digits, 4300 unless configured, so every
+# value within this fits in a reply.
+MAX_BITS = 10000
+
+
+# ===========================
+# LATENCY STATS
+# ===========================
+class LatencyStats:
+    def __init__(self, samples=LATENCY_SAMPLES):
+        self.count = 0
+        self.samples = deque(maxlen=samples)
+
+    def record(self, seconds):
+        self.count += 1
+        self.samples.append(seconds)
+
+    def percentiles(self, *quantiles):
+        ordered = sorted(self.samples)
+        if not ordered: return [0.0 for _ in quantiles]
+        return [ordered[min(int(q * len(ordered)), len(ordered) - 1)] for q in quantiles]
+
+    def asDict(self):
+        p50, p90, p99 = self.percentiles(0.5, 0.9, 0.99)
+        return {
+            'requests': self.count,
+            'p50_ms': p50 * 1e3,
+            'p90_ms': p90 * 1e3,
+            'p99_ms': p99 * 1e3,
+            'max_ms': max(self.samples, default=0.0) * 1e3,
+        }
+
+
+# ===========================
+# SESSION
+# ===========================
+class Session:
+    def __init__(self, session_id):
+        self.id = session_id
+        self.symbols = SymbolTable()
+        self.latency = LatencyStats()
+        self.started = time.monotonic()
+
+
+def encode(result):
+    if isinstance(result, ErrorBase):
+        return {
+            'error': result.name, 'details': result.details,
+            'start': result.pos_start.index, 'end': result.pos_end.index,
+        }
+    return {'value': None if result is None else result.value}
+
+
+# ===========================
+# SERVER
+# ===========================
+class Server:
+    """
+    Evaluates the programs each connection sends in a session of its own.
+
+    Sessions are served concurrently: evaluations yield to the event loop
+    as they go, so a long program does not hold up the others, and
+    `timeout` bounds each one. Sessions share one filename, so they share
+    parses too.
+
+    A session's requests are evaluated one at a time, in order, and each
+    answer is drained to the socket before the next line is read, so a
+    client that stops reading stops being served instead of filling the
+    server's memory. Past `max_sessions`, new connections are turned away.
+
+    Programs are parsed with the iterative parser, so nesting cannot
+    exhaust the Python stack, and checked against `budget` before they
+    run, as one huge operation would hold the event loop for all sessions.
+    """
+
+    def __init__(self, idle_timeout=300.0, max_sessions=1024, timeout=None, optimize=False, parser='iterative',
+                 budget: Budget = None):
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.timeout = timeout
+        self.optimize = optimize
+        self.parser = parser
+        self.budget = Budget(max_bits=MAX_BITS) if budget is None else budget
+
+        self.sessions = {}
+        self.ids = itertools.count(1)
+        self.evicted = 0
+        self.server = None
+
+    async def start(self, host='127.0.0.1', port=DEFAULT_PORT, path=None):
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.serve, path, limit=MAX_LINE)
+        else:
+            self.server = await asyncio.start_server(self.serve, host, port, limit=MAX_LINE)
+        return self.server
+
+    async def serve(self, reader, writer):
+        if len(self.sessions) >= self.max_sessions:
+            await self.send(writer, {'error': 'Server Busy', 'details': f'More than {self.max_sessions} sessions'})
+            writer.close()
+            return
+
+        session = Session(next(self.ids))
+        self.sessions[session.id] = session
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    self.evicted += 1
+                    break
+                except ValueError:
+                    await self.send(writer, {'error': 'Protocol Error', 'details': f'Lines are limited to {MAX_LINE} bytes'})
+                    break
+                if not line: break
+
+                start = time.perf_counter()
+                text = line.decode('utf-8', 'replace').rstrip('\r\n')
+                if text.startswith(':'):
+                    reply = self.command(session, text)
+                    if reply is None: break
+                else:
+                    reply = await self.evaluate(session, text)
+
+                await self.send(writer, reply)
+                session.latency.record(time.perf_counter() - start)
+        except ConnectionError:
+            pass
+        finally:
+            del self.sessions[session.id]
+            writer.close()
+
+    async def evaluate(self, session: Session, text):
+        # Whatever goes wrong with one request, the session carries on
+        try:
+            return encode(await interpretAsync(
+                '<session>', text, self.optimize, parser=self.parser,
+                timeout=self.timeout, symbols=session.symbols, budget=self.budget
+            ))
+        except Exception as exception:
+            return {'error': 'Internal Error', 'details': f'{type(exception).__name__}: {exception}'}
+
+    def command(self, session: Session, text):
+        name = text[1:].strip()
+        if name == 'quit': return None
+        if name == 'stats': return self.stats(session)
+        if name == 'reset':
+            session.symbols.clear()
+            return {'value': None}
+        return {'error': 'Unknown Command', 'details': f'Expected :stats, :reset or :quit, not {text}'}
+
+    def stats(self, session: Session):
+        return {
+            'session': session.id,
+            'latency': session.latency.asDict(),
+            'sessions': len(self.sessions),
+            'evicted': self.evicted,
+            'parse_cache': {'hits': PARSE_CACHE.hits, 'misses': PARSE_CACHE.misses},
+        }
+
+    @staticmethod
+    async def send(writer, reply):
+        writer.write(json.dumps(reply).encode() + b'\n')
+        await writer.drain()
+
+    async def run(self, host='127.0.0.1', port=DEFAULT_PORT, path=None):
+        server = await self.start(host, port, path)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix', metavar='PATH', help='serve on a Unix socket instead of TCP')
+    parser.add_argument('--idle-timeout', type=float, default=300.0, help='seconds before an idle session is closed')
+    parser.add_argument('--max-sessions', type=int, default=1024)
+    parser.add_argument('--timeout', type=float, default=None, help='seconds each evaluation may take')
+    parser.add_argument('--max-bits', type=int, default=MAX_BITS, help='largest int a program may produce, in bits')
+    args = parser.parse_args(argv)
+
+    server = Server(args.idle_timeout, args.max_sessions, args.timeout, budget=Budget(max_bits=args.max_bits))
+    try:
+        asyncio.run(server.run(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,8 @@
+import sys
 from enum import Enum
-from language.utils import Position
+from array import array
+from types import MappingProxyType
+from language.utils import Position, LineIndex
 
 
 # ===========================
@@ -15,6 +18,13 @@ class Keyword(Enum):
     ELIF = 'yaphir'
     ELSE = 'nahitho'
 
+    # Members are singletons compared by identity; hashing them by identity
+    # too keeps dict lookups keyed by them out of Python code
+    __hash__ = object.__hash__
+
+
+KEYWORDS = {keyword.value: keyword for keyword in Keyword}
+
 
 # ===========================
 # TOKEN TYPES
@@ -44,11 +54,15 @@ class TokenType(Enum):
     LESS_THAN_EQUAL = '<='
     GREATER_THAN_EQUAL = '>='
 
+    __hash__ = object.__hash__
+
 
 # ===========================
 # TOKEN CLASS
 # ===========================
 class Token:
+    __slots__ = ('token_type', 'value', 'pos_start', 'pos_end')
+
     def __init__(self, token_type: TokenType, value=None, pos_start: Position = None, pos_end: Position = None):
         self.token_type = token_type
         self.value = value
@@ -66,22 +80,178 @@ class Token:
         return self.token_type.name
 
 
+class SpanToken(Token):
+    """
+    Token lexed from the first line of its source, between two offsets. Its
+    positions are only built, and then kept, the first time they are asked
+    for; the parser never asks for those of most operators.
+    """
+
+    __slots__ = ('filename', 'text', 'start', 'end')
+
+    def __init__(self, token_type: TokenType, value, filename, text, start, end):
+        self.token_type = token_type
+        self.value = value
+        self.filename = filename
+        self.text = text
+        self.start = start
+        self.end = end
+
+    @property
+    def pos_start(self):
+        start = self.start
+        if start.__class__ is int:
+            start = self.start = Position(self.filename, self.text, start, 0, start)
+        return start
+
+    @property
+    def pos_end(self):
+        end = self.end
+        if end.__class__ is int:
+            end = self.end = Position(self.filename, self.text, end, 0, end)
+        return end
+
+    def __reduce__(self):
+        # The positions are properties, so it is pickled as the offsets it was made from
+        return SpanToken, (self.token_type, self.value, self.filename, self.text, self.pos_start.index, self.pos_end.index)
+
+
+# ===========================
+# TOKEN STREAM
+# ===========================
+TOKEN_TYPES = list(TokenType)
+TOKEN_CODES = {token_type: code for code, token_type in enumerate(TOKEN_TYPES)}
+
+
+class TokenStream:
+    """
+    Compact sequence of tokens kept as parallel arrays of type codes, values
+    and start/end offsets into the source.
+
+    Indexing builds a token on demand, and line and column numbers are only
+    derived, from the source's line index, when its positions are asked for.
+    A stream is a small fraction of the size of a list of Tokens.
+    """
+
+    def __init__(self, filename, text):
+        self.filename = filename
+        self.text = text
+
+        self.types = array('B')
+        self.values = []
+        self.starts = array('q')
+        self.ends = array('q')
+        self.lines = None
+
+    def append(self, token_type: TokenType, value, start, end):
+        self.types.append(TOKEN_CODES[token_type])
+        self.values.append(value)
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def position(self, index):
+        if self.lines is None:
+            self.lines = LineIndex(self.text)
+
+        line = self.lines.lineOf(index)
+        return Position(self.filename, self.text, index, line, self.lines.columnOf(index, line), self.lines)
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, i):
+        return StreamToken(self, i)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class StreamToken(Token):
+    """
+    Token read out of a TokenStream. Its positions are only built, and then
+    kept, the first time they are asked for; the parser never asks for most.
+    """
+
+    __slots__ = ('stream', 'index', 'start', 'end')
+
+    def __init__(self, stream: TokenStream, i):
+        self.token_type = TOKEN_TYPES[stream.types[i]]
+        self.value = stream.values[i]
+        self.stream = stream
+        self.index = i
+        self.start = self.end = None
+
+    @property
+    def pos_start(self):
+        if self.start is None:
+            self.start = self.stream.position(self.stream.starts[self.index])
+        return self.start
+
+    @property
+    def pos_end(self):
+        if self.end is None:
+            self.end = self.stream.position(self.stream.ends[self.index])
+        return self.end
+
+    def __reduce__(self):
+        # Pickled as a plain Token, rather than with the whole stream
+        return Token, (self.token_type, self.value, self.pos_start, self.pos_end)
+
+
 # ===========================
 # SYMBOL TABLE
 # ===========================
+def slotOf(name):
+    # The slot of a variable is its name, interned, so every table is keyed by
+    # the very string a resolved tree carries and lookups match by identity
+    return sys.intern(name)
+
+
 class SymbolTable:
+    """
+    Variables kept in a dict keyed by slot. Resolved trees read `values` by
+    the slot they carry; embedders keep using get, set and remove by name,
+    and can read `symbols`, a read-only view by name.
+    A variable missing here, or set to None, is looked up in the parent.
+    """
+
     def __init__(self):
-        self.symbols = {}
+        self.values = {}
         self.parent = None
+        self.version = 0
+
+    @property
+    def symbols(self):
+        return MappingProxyType(self.values)
 
     def get(self, variable):
-        value = self.symbols.get(variable)
-        if value is not None and self.parent:
-            return self.parent.get(variable)
+        return self.load(variable)
+
+    def load(self, slot):
+        value = self.values.get(slot)
+        if value is None and self.parent:
+            return self.parent.load(slot)
         return value
 
     def set(self, variable, value):
-        self.symbols[variable] = value
+        self.store(slotOf(variable), value)
+
+    def store(self, slot, value):
+        self.values[slot] = value
+        self.version += 1
 
     def remove(self, variable):
-        del self.symbols[variable]
+        del self.values[variable]
+        self.version += 1
+
+    def clear(self):
+        # Emptied in place, so dicts already handed out stay current
+        self.values.clear()
+        self.version += 1
+
+    def copy(self):
+        table = SymbolTable()
+        table.values = self.values.copy()
+        table.parent = self.parent
+        table.version = self.version
+        return table
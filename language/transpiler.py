@@ -0,0 +1,317 @@
+import os
+import sys
+import math
+import marshal
+import hashlib
+import threading
+from collections import OrderedDict
+
+from language.datatypes import Number
+from language.nodes import *
+from language.errors import RunTimeError
+from language.utils import Position
+from language.tokens import TokenType, Keyword
+from language.results import RuntimeResult
+from language.bytecode import valueOrigin
+from language.parsing import Interpreter
+from language.cache import parseSource
+
+CACHE_VERSION = 1
+
+PYTHON_OPERATORS = {
+    TokenType.PLUS: '+',
+    TokenType.MINUS: '-',
+    TokenType.MULTIPLY: '*',
+    TokenType.POWER: '**',
+}
+
+PYTHON_COMPARISONS = {
+    TokenType.EQUAL: '==',
+    TokenType.NOT_EQUAL: '!=',
+    TokenType.LESS_THAN: '<',
+    TokenType.LESS_THAN_EQUAL: '<=',
+    TokenType.GREATER_THAN: '>',
+    TokenType.GREATER_THAN_EQUAL: '>=',
+}
+
+
+class ProgramFailure(Exception):
+    def __init__(self, site, details):
+        super().__init__(details)
+        self.site = site
+        self.details = details
+
+
+# ===========================
+# TRANSPILER
+# ===========================
+class Transpiler:
+    """
+    Turns a parsed node tree into the source of a Python function.
+
+    FunLang variables become locals holding raw ints and floats, loaded from
+    the symbol table once on entry and written back by `store` on every
+    assignment. Anything that can fail at runtime refers to a site, whose
+    (pos_start, pos_end) are saved next to the code so errors can be rebuilt.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.sites = []
+        self.marking = False
+
+    def transpile(self, node):
+        expr = self.visit(node)
+        self.addSite(node)
+
+        lines = [f'def program(symbols, store, div, andWith, orWith, fail):']
+        for i, name in enumerate(self.names):
+            lines.append(f'    v{i} = symbols.get({name!r})')
+            lines.append(f'    v{i} = None if v{i} is None else v{i}.value')
+        lines.append(f'    return {expr}')
+        return '\n'.join(lines) + '\n'
+
+    def addSite(self, node):
+        self.sites.append((node.pos_start, node.pos_end))
+        return len(self.sites) - 1
+
+    def local(self, name):
+        if name not in self.names:
+            self.names.append(name)
+        return f'v{self.names.index(name)}'
+
+    def visit(self, node):
+        name = f'transpile{type(node).__name__}'
+        method = getattr(self, name)
+        return method(node)
+
+    def transpileNumberNode(self, node: NumberNode):
+        value = node.token.value
+        if isinstance(value, float) and not math.isfinite(value):
+            return f'float({str(value)!r})'
+        return repr(value)
+
+    def transpileUnaryOpNode(self, node: UnaryOpNode):
+        if node.operator.token_type == TokenType.MINUS:
+            return f'(-{self.visit(node.node)})'
+        return self.visit(node.node)
+
+    def transpileBinaryOpNode(self, node: BinaryOpNode):
+        token_type = node.operator.token_type
+        left = self.visit(node.left)
+
+        if token_type == TokenType.DIVIDE:
+            origin = valueOrigin(node.right)
+            if origin:
+                return f'div({left}, {self.visit(node.right)}, {self.addSite(origin)})'
+
+            marking, self.marking = self.marking, True
+            right = self.visit(node.right)
+            self.marking = marking
+            return f'div({left}, {right}, mark)'
+
+        right = self.visit(node.right)
+        if token_type in PYTHON_OPERATORS:
+            return f'({left} {PYTHON_OPERATORS[token_type]} {right})'
+        if token_type in PYTHON_COMPARISONS:
+            return f'(1 if {left} {PYTHON_COMPARISONS[token_type]} {right} else 0)'
+        if node.operator.value == Keyword.AND:
+            return f'andWith({left}, {right})'
+        return f'orWith({left}, {right})'
+
+    def transpileVarAccessNode(self, node: VarAccessNode):
+        local = self.local(node.var_name.value)
+        return f'({local} if {local} is not None else fail({self.addSite(node)}, {node.var_name.value!r}))'
+
+    def transpileVarAssignNode(self, node: VarAssignNode):
+        name = node.var_name.value
+        value = self.visit(node.value)
+        return f'store({name!r}, ({self.local(name)} := {value}), {self.addSite(node.value)})'
+
+    def transpileConditionsNode(self, node: ConditionsNode):
+        marking, self.marking = self.marking, False
+        branches = []
+
+        for cond, expr in node.cases:
+            cond = self.visit(cond)
+            self.marking = marking
+            branches.append((cond, self.branch(expr, marking)))
+            self.marking = False
+
+        self.marking = marking
+        code = self.branch(node.else_case, marking) if node.else_case else 'None'
+        for cond, expr in reversed(branches):
+            code = f'({expr} if {cond} else {code})'
+        return code
+
+    def branch(self, node, marking):
+        code = self.visit(node)
+        origin = valueOrigin(node)
+        if marking and origin:
+            return f'({code}, mark := {self.addSite(origin)})[0]'
+        return code
+
+
+# ===========================
+# COMPILED PROGRAM
+# ===========================
+class Program:
+    def __init__(self, code, names, sites, node=None):
+        self.code = code
+        self.names = names
+        self.sites = sites
+        self.node = node
+        self.positions = {}
+        self.function = None
+
+        if code is not None:
+            namespace = {}
+            exec(code, namespace)
+            self.function = namespace['program']
+
+    @classmethod
+    def fromNode(cls, node):
+        transpiler = Transpiler()
+        try:
+            source = transpiler.transpile(node)
+            code = compile(source, '<funlang>', 'exec')
+        except (SyntaxError, RecursionError, MemoryError):
+            # Nesting beyond what CPython's own compiler accepts runs on the tree walker
+            return cls(None, [], [], node)
+
+        sites = tuple(
+            (start.index, start.line_no, start.col_no, end.index, end.line_no, end.col_no)
+            for start, end in transpiler.sites
+        )
+        return cls(code, transpiler.names, sites)
+
+    def sitePositions(self, filename, text):
+        key = (filename, text)
+        positions = self.positions.get(key)
+        if positions is None:
+            positions = [(
+                Position(filename, text, start_index, start_line, start_col),
+                Position(filename, text, end_index, end_line, end_col),
+            ) for start_index, start_line, start_col, end_index, end_line, end_col in self.sites]
+            # Replaced rather than cleared, as other threads may be reading it
+            self.positions = {key: positions}
+        return positions
+
+    def run(self, context, filename, text):
+        if self.function is None:
+            return Interpreter(context).visit(self.node)
+
+        symbols = context.symbol_table
+        positions = self.sitePositions(filename, text)
+
+        def store(name, value, site):
+            symbols.set(name, None if value is None else Number(value, *positions[site], context))
+            return value
+
+        try:
+            value = self.function(symbols, store, div, andWith, orWith, fail)
+        except ProgramFailure as failure:
+            pos_start, pos_end = positions[failure.site]
+            return RuntimeResult().failure(RunTimeError(context, failure.details, pos_start, pos_end))
+
+        if value is None: return RuntimeResult().success(None)
+        return RuntimeResult().success(Number(value, *positions[-1], context))
+
+
+def div(left, right, site):
+    if right == 0: raise ProgramFailure(site, 'Division by zero not defined')
+    return left / right
+
+
+def andWith(left, right):
+    return int(left and right)
+
+
+def orWith(left, right):
+    return int(left or right)
+
+
+def fail(site, name):
+    raise ProgramFailure(site, f'{name} is not defined!')
+
+
+def compileSource(filename, text, optimize=False, lexer='regex', parser='recursive'):
+    node, error = parseSource(filename, text, optimize, lexer, parser)
+    if error: return None, error
+    return Program.fromNode(node), None
+
+
+# ===========================
+# CODE CACHE
+# ===========================
+class CodeCache:
+    """
+    Compiled programs keyed by a hash of their source text.
+
+    Programs are always kept in memory, up to `capacity` of them, evicting
+    the least recently used first. When a `directory` is given, their code
+    objects are also marshalled there so a restarted process can skip
+    lexing, parsing and compiling altogether.
+    """
+
+    def __init__(self, capacity=1024, directory=None):
+        self.capacity = capacity
+        self.directory = directory
+        self.programs = OrderedDict()
+        self.lock = threading.Lock()
+
+    def key(self, text, optimize=False):
+        digest = hashlib.sha256(text.encode('utf-8', 'surrogatepass')).hexdigest()
+        return f'{digest}-o' if optimize else digest
+
+    def path(self, key):
+        return os.path.join(self.directory, f'{key}.{sys.implementation.cache_tag}.func')
+
+    def load(self, filename, text, optimize=False, lexer='regex', parser='recursive'):
+        key = self.key(text, optimize)
+
+        with self.lock:
+            program = self.programs.get(key)
+            if program is not None:
+                self.programs.move_to_end(key)
+                return program, None
+
+        if self.directory:
+            program = self.readDisk(key)
+
+        if program is None:
+            program, error = compileSource(filename, text, optimize, lexer, parser)
+            if error: return None, error
+            if self.directory and program.code is not None:
+                self.writeDisk(key, program)
+
+        with self.lock:
+            self.programs[key] = program
+            while len(self.programs) > self.capacity:
+                self.programs.popitem(last=False)
+        return program, None
+
+    def readDisk(self, key):
+        try:
+            with open(self.path(key), 'rb') as file:
+                version, code, names, sites = marshal.load(file)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+        if version != CACHE_VERSION: return None
+        return Program(code, list(names), sites)
+
+    def writeDisk(self, key, program):
+        path = self.path(key)
+        temp = f'{path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp, 'wb') as file:
+                marshal.dump((CACHE_VERSION, program.code, tuple(program.names), program.sites), file)
+            os.replace(temp, path)
+        except OSError:
+            pass
+
+    def clear(self):
+        with self.lock:
+            self.programs.clear()
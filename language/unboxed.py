@@ -0,0 +1,121 @@
+from language.datatypes import Number
+from language.nodes import *
+from language.errors import RunTimeError
+from language.tokens import TokenType
+from language.results import RuntimeResult
+from language.parsing import Interpreter
+from language.adaptive import EvaluationFailure, OPERATIONS
+
+
+# ===========================
+# UNBOXED INTERPRETER
+# ===========================
+class UnboxedInterpreter(Interpreter):
+    """
+    Tree walker that evaluates straight to Python ints and floats.
+
+    No Number, RuntimeResult or Position is made while evaluating: values are
+    only boxed by visit() on the way out, and on assignment since the symbol
+    table is shared with the other engines. Errors raise EvaluationFailure
+    with the node that failed, and the RunTimeError is built from it then.
+    """
+
+    def __init__(self, context):
+        super().__init__(context)
+        self.taken = {}
+        self.methods = {
+            NumberNode: self.evaluateNumberNode,
+            UnaryOpNode: self.evaluateUnaryOpNode,
+            BinaryOpNode: self.evaluateBinaryOpNode,
+            VarAccessNode: self.evaluateVarAccessNode,
+            VarAssignNode: self.evaluateVarAssignNode,
+            ConditionsNode: self.evaluateConditionsNode,
+        }
+
+    def visit(self, node):
+        try:
+            value = self.evaluate(node)
+            if value is None: return RuntimeResult().success(None)
+            return RuntimeResult().success(self.box(value, node))
+        except EvaluationFailure as failure:
+            return RuntimeResult().failure(RunTimeError(
+                self.context, failure.details,
+                failure.node.pos_start, failure.node.pos_end
+            ))
+        finally:
+            # Branches only position the values of one evaluation, and would keep its tree alive
+            self.taken.clear()
+
+    def evaluate(self, node):
+        return self.methods[node.__class__](node)
+
+    def box(self, value, node):
+        origin = self.origin(node)
+        return Number(value, origin.pos_start, origin.pos_end, self.context)
+
+    def origin(self, node):
+        # The node whose positions the value of `node` carries
+        while True:
+            if isinstance(node, VarAssignNode):
+                node = node.value
+            elif isinstance(node, ConditionsNode):
+                node = self.taken[node]
+            else:
+                return node
+
+    def evaluateNumberNode(self, node: NumberNode):
+        return node.token.value
+
+    def evaluateUnaryOpNode(self, node: UnaryOpNode):
+        value = self.evaluate(node.node)
+        if node.operator.token_type == TokenType.MINUS:
+            return value * -1
+        return value
+
+    def evaluateBinaryOpNode(self, node: BinaryOpNode):
+        return self.operate(node, self.evaluate(node.left), self.evaluate(node.right))
+
+    def operate(self, node: BinaryOpNode, left, right):
+        operator = node.operator
+        operation = OPERATIONS.get(operator.token_type) or OPERATIONS[operator.value]
+
+        try:
+            return operation(left, right)
+        except ZeroDivisionError:
+            if operator.token_type != TokenType.DIVIDE: raise
+            raise EvaluationFailure(self.origin(node.right), 'Division by zero not defined')
+
+    def evaluateVarAccessNode(self, node: VarAccessNode):
+        symbols = self.context.symbol_table
+        try:
+            value = symbols.values[node.slot]
+        except KeyError:
+            value = None
+
+        if value is None:
+            # Unresolved trees, variables missing here and parent tables
+            value = symbols.get(node.var_name.value)
+        if value is None:
+            raise EvaluationFailure(node, f'{node.var_name.value} is not defined!')
+        return value.value
+
+    def evaluateVarAssignNode(self, node: VarAssignNode):
+        value = self.evaluate(node.value)
+        self.store(node, None if value is None else self.box(value, node))
+        return value
+
+    def store(self, node, value):
+        symbols = self.context.symbol_table
+        if node.slot is None:
+            symbols.set(node.var_name.value, value)
+        else:
+            symbols.store(node.slot, value)
+
+    def evaluateConditionsNode(self, node: ConditionsNode):
+        for cond, expr in node.cases:
+            if self.evaluate(cond) != 0:
+                self.taken[node] = expr
+                return self.evaluate(expr)
+
+        self.taken[node] = node.else_case
+        return self.evaluate(node.else_case) if node.else_case else None
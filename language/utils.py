@@ -1,13 +1,27 @@
+import io
+import re
+import mmap
+from array import array
+from bisect import bisect_left
+
+NEWLINE = re.compile('\n')
+CHUNK_SIZE = 1 << 20
+
+
 # ===========================
 # POSITION
 # ===========================
 class Position:
-    def __init__(self, filename, text, index=-1, line_no=0, col_no=-1):
+    # `lines` is the LineIndex of `text`, when whatever made the position had one
+    __slots__ = ('filename', 'text', 'index', 'line_no', 'col_no', 'lines')
+
+    def __init__(self, filename, text, index=-1, line_no=0, col_no=-1, lines=None):
         self.filename = filename
         self.text = text
         self.index = index
         self.line_no = line_no
         self.col_no = col_no
+        self.lines = lines
 
     def increment(self, char=None):
         self.index += 1
@@ -20,15 +34,87 @@ class Position:
         return self
 
     def copy(self):
-        return Position(self.filename, self.text, self.index, self.line_no, self.col_no)
+        return Position(self.filename, self.text, self.index, self.line_no, self.col_no, self.lines)
+
+
+# ===========================
+# LINE INDEX
+# ===========================
+class LineIndex:
+    """
+    Offsets of every newline in a source, so the line and column of an index
+    are found by bisection instead of by scanning the text.
+    """
+
+    def __init__(self, text):
+        self.newlines = array('q', [found.start() for found in NEWLINE.finditer(text)])
+
+    def lineOf(self, index):
+        return bisect_left(self.newlines, index)
+
+    def columnOf(self, index, line=None):
+        if line is None: line = self.lineOf(index)
+        return index - self.newlines[line - 1] - 1 if line else index
+
+    def lastNewlineBefore(self, index):
+        # Like text.rfind('\n', 0, index)
+        found = bisect_left(self.newlines, index) - 1
+        return self.newlines[found] if found >= 0 else -1
+
+    def nextNewlineFrom(self, index):
+        # Like text.find('\n', index)
+        found = bisect_left(self.newlines, index)
+        return self.newlines[found] if found < len(self.newlines) else -1
 
 
 # ===========================
 # CONTEXT
 # ===========================
 class Context:
+    __slots__ = ('context_name', 'parent', 'parent_entry', 'symbol_table')
+
     def __init__(self, context_name, parent=None, parent_entry: Position = None, symbol_table=None):
         self.context_name = context_name
         self.parent = parent
         self.parent_entry = parent_entry
         self.symbol_table = symbol_table
+
+
+# ===========================
+# INPUT
+# ===========================
+def readChunks(file, chunk_size=CHUNK_SIZE):
+    # Memory-mapped when the file allows it, so pages are read on demand
+    # and dropped again by the OS instead of being copied into the process.
+    try:
+        view = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        view = None
+
+    if view is None:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk: return
+            yield chunk
+
+    with view:
+        if hasattr(view, 'madvise'): view.madvise(mmap.MADV_SEQUENTIAL)
+        for offset in range(0, len(view), chunk_size):
+            yield view[offset: offset + chunk_size]
+
+
+def readLines(file, chunk_size=CHUNK_SIZE, encoding='utf-8'):
+    # Parts of a line spanning several chunks are only joined once it ends,
+    # so a long line is copied once rather than once per chunk
+    rest = []
+    for chunk in readChunks(file, chunk_size):
+        rest.append(chunk)
+        if b'\n' not in chunk: continue
+
+        lines = b''.join(rest).split(b'\n')
+        rest = [lines.pop()]
+        for line in lines:
+            yield line.decode(encoding) + '\n'
+
+    rest = b''.join(rest)
+    if rest: yield rest.decode(encoding)
@@ -0,0 +1,179 @@
+from language.nodes import *
+from language.errors import RunTimeError, RuntimeFailure
+from language.tokens import TokenType, Keyword
+from language.results import BatchResult
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def truncate(values):
+    # int() of a value, as the scalar engines take it for comparisons and logic
+    return np.asarray(values).astype(np.int64)
+
+
+def equalTo(left, right): return truncate(left == right)
+def notEqualTo(left, right): return truncate(left != right)
+def lessThan(left, right): return truncate(left < right)
+def lessThanEqTo(left, right): return truncate(left <= right)
+def greaterThan(left, right): return truncate(left > right)
+def greaterThanEqualTo(left, right): return truncate(left >= right)
+def andWith(left, right): return truncate(np.where(left != 0, right, left))
+def orWith(left, right): return truncate(np.where(left != 0, left, right))
+
+
+# Division and power may fail per row, so BatchInterpreter handles those itself
+OPERATIONS = {
+    TokenType.PLUS: lambda left, right: left + right,
+    TokenType.MINUS: lambda left, right: left - right,
+    TokenType.MULTIPLY: lambda left, right: left * right,
+
+    TokenType.EQUAL: equalTo,
+    TokenType.NOT_EQUAL: notEqualTo,
+    TokenType.LESS_THAN: lessThan,
+    TokenType.LESS_THAN_EQUAL: lessThanEqTo,
+    TokenType.GREATER_THAN: greaterThan,
+    TokenType.GREATER_THAN_EQUAL: greaterThanEqualTo,
+
+    Keyword.AND: andWith,
+    Keyword.OR: orWith,
+}
+
+
+# ===========================
+# BATCH INTERPRETER
+# ===========================
+class BatchInterpreter:
+    """
+    Evaluates one tree over many rows at once, each variable bound to a
+    NumPy array (or a scalar, which every row shares) in `columns`.
+
+    Operators run element-wise and conditions select per row with masks.
+    Every node is evaluated over all rows, while `active` tracks the rows
+    that really reach it, so a division by zero only fails the rows that
+    would have divided. Failed rows, and rows no condition branch gave a
+    value, are flagged in the result rather than stopping the batch; the
+    values in those rows mean nothing.
+
+    Variables missing from `columns` are read from the context's symbol
+    table. Assignments bind the batch's own columns and leave the symbol
+    table alone, since their values differ per row. Integers are 64-bit.
+    """
+
+    def __init__(self, context, columns):
+        if np is None:
+            raise ImportError('Batch evaluation needs NumPy, install it with: pip install numpy')
+
+        self.context = context
+        self.columns = {name: np.asarray(column) for name, column in columns.items()}
+        self.shape = np.broadcast_shapes(*(column.shape for column in self.columns.values()))
+        self.failed = np.zeros(self.shape, dtype=bool)
+        self.missing = np.zeros(self.shape, dtype=bool)
+        self.methods = {
+            NumberNode: self.evaluateNumberNode,
+            UnaryOpNode: self.evaluateUnaryOpNode,
+            BinaryOpNode: self.evaluateBinaryOpNode,
+            VarAccessNode: self.evaluateVarAccessNode,
+            VarAssignNode: self.evaluateVarAssignNode,
+            ConditionsNode: self.evaluateConditionsNode,
+        }
+
+    def visit(self, node) -> BatchResult:
+        res = BatchResult()
+        try:
+            with np.errstate(all='ignore'):
+                value = self.evaluate(node, np.ones(self.shape, dtype=bool))
+        except RuntimeFailure as failure:
+            return res.failure(failure.error)
+
+        value = np.array(np.broadcast_to(value, self.shape))
+        return res.success(value, self.failed, self.missing)
+
+    def evaluate(self, node, active):
+        return self.methods[node.__class__](node, active)
+
+    def fail(self, rows, active):
+        self.failed |= rows & active
+
+    def evaluateNumberNode(self, node: NumberNode, active):
+        return np.asarray(node.token.value)
+
+    def evaluateUnaryOpNode(self, node: UnaryOpNode, active):
+        value = self.evaluate(node.node, active)
+        if node.operator.token_type == TokenType.MINUS:
+            return -value
+        return value
+
+    def evaluateBinaryOpNode(self, node: BinaryOpNode, active):
+        left = self.evaluate(node.left, active)
+        right = self.evaluate(node.right, active)
+
+        token_type = node.operator.token_type
+        if token_type == TokenType.DIVIDE:
+            return self.divide(left, right, active)
+        if token_type == TokenType.POWER:
+            return self.power(left, right, active)
+
+        operator = node.operator
+        operation = OPERATIONS.get(token_type) or OPERATIONS[operator.value]
+        return operation(left, right)
+
+    def divide(self, left, right, active):
+        zero = right == 0
+        if not zero.any():
+            return np.true_divide(left, right)
+
+        self.fail(zero, active)
+        return np.where(zero, np.nan, np.true_divide(left, np.where(zero, 1, right)))
+
+    def power(self, left, right, active):
+        negative = right < 0
+        if negative.any():
+            # Python fails for negative powers of zero, and gives floats for the rest
+            self.fail((left == 0) & negative, active)
+            if right.dtype.kind in 'iu': left = left.astype(np.float64)
+        return np.power(left, right)
+
+    def evaluateVarAccessNode(self, node: VarAccessNode, active):
+        var = node.var_name.value
+        value = self.columns.get(var)
+        if value is not None: return value
+
+        value = self.context.symbol_table.get(var)
+        if value is None:
+            raise RuntimeFailure(RunTimeError(
+                self.context, f'{var} is not defined!',
+                node.pos_start, node.pos_end
+            ))
+        return np.asarray(value.value)
+
+    def evaluateVarAssignNode(self, node: VarAssignNode, active):
+        var = node.var_name.value
+        value = self.evaluate(node.value, active)
+
+        previous = self.columns.get(var)
+        self.columns[var] = value if previous is None else np.where(active, value, previous)
+        return value
+
+    def evaluateConditionsNode(self, node: ConditionsNode, active):
+        result = None
+        remaining = active
+
+        for cond, expr in node.cases:
+            if not remaining.any(): break
+
+            taken = remaining & (self.evaluate(cond, remaining) != 0)
+            if taken.any():
+                value = self.evaluate(expr, taken)
+                result = value if result is None else np.where(taken, value, result)
+            remaining = remaining & ~taken
+
+        if node.else_case and remaining.any():
+            value = self.evaluate(node.else_case, remaining)
+            result = value if result is None else np.where(remaining, value, result)
+        else:
+            self.missing |= remaining
+
+        return np.zeros(self.shape, dtype=np.int64) if result is None else result
@@ -1,4 +1,11 @@
-from language.core import interpret
+import sys
+
+from language.core import interpret, interpretScript
+
+if len(sys.argv) > 1:
+    for res in interpretScript(sys.argv[1], sys.argv[1]):
+        print(res, '\n')
+    sys.exit()
 
 while True:
     inp = input('shell >>> ')